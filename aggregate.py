@@ -0,0 +1,286 @@
+# Build every locale's data release (data/<locale>/*.csv) from the raw weekly questionnaire exports:
+#
+#   python aggregate.py exports/*.csv --population population.csv [--output data] [--chunksize 200000]
+#   python aggregate.py --incremental exports/2024-06-19.csv --population population.csv
+#
+# An export has one row per weekly questionnaire, with the columns
+#
+#   participant  participant id
+#   date         date the questionnaire was filled in (YYYY-MM-DD)
+#   province     province of residence, by its English name (the name-english property in provinces.geojson)
+#   sex          male, female or other
+#   age          age in years
+#   ili          1 if the answers match the flu-like case definition, else 0
+#   covid_like   1 if the answers match the COVID-like case definition, else 0
+#   <symptom>    one 0/1 column per symptom in SYMPTOMS
+#
+# and the population file has the columns province (English name) and population.
+#
+# The exports are read in chunks and every chunk is reduced to weekly totals right away, so memory
+# grows with the number of weeks and participants, not with the number of questionnaires. Participants
+# fill in one questionnaire a week, so the questionnaires of a week are counted as its participants.
+# The release is written in one go, manifest.json last, so the watcher in datastore.py never picks up
+# a half-written release.
+#
+# The totals are saved in --state (Parquet files) after every run. With --incremental they are loaded
+# again, only the given exports are read (exports that were already added are skipped) and only the
+# rows of the weeks they touch are replaced or appended in the symptoms, flulike and covidlike files,
+# so the weekly refresh doesn't get slower as the history grows.
+import argparse
+import datetime
+import io
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import i18n
+
+# Raw column of every symptom, translated with the "values" in the locale catalogs
+SYMPTOMS = [
+    "runny_nose", "sneezing", "cough", "headache", "sore_throat", "malaise", "muscle_pain", "coloured_sputum",
+    "shortness_of_breath", "loss_of_appetite", "fever", "chills", "diarrhoea", "watery_eyes", "chest_pain",
+    "nausea", "stomach_ache", "vomiting", "loss_of_taste", "loss_of_smell", "nose_bleed",
+]
+CASE_DEFINITIONS = {"flulike": "ili", "covidlike": "covid_like"}
+DTYPES = {
+    "participant": "str", "date": "str", "province": "category", "sex": "category", "age": "float32",
+    "ili": "int8", "covid_like": "int8", **{symptom: "int8" for symptom in SYMPTOMS},
+}
+AGE_BINS = [0, 10, 20, 30, 40, 50, 60, 70, 80, np.inf]
+AGE_GROUPS = ["0-9", "10-19", "20-29", "30-39", "40-49", "50-59", "60-69", "70-79", "80+"]
+# Same as datastore.WEEK_FORMAT, importing datastore would load the current release
+WEEK_FORMAT = "%Y/%m/%d"
+STATE_DIR = os.getenv("AGGREGATE_STATE_DIR", "build/aggregate")
+
+
+def accumulate(total, part):
+    # The 0/1 columns are read as int8, the totals need room to grow
+    part = part.astype("int64")
+    return part if total is None else total.add(part, fill_value=0).astype("int64")
+
+
+class Aggregator:
+    """Running totals over all the questionnaires added so far."""
+
+    def __init__(self):
+        self.questionnaires = 0
+        # Per week (the Sunday it ends on): questionnaires and how many reported every symptom
+        self.symptoms = None
+        # Per ISO year and week: questionnaires and how many matched every case definition
+        self.cases = None
+        # Latest province, sex and age of every participant
+        self.participants = None
+        # Names of the exports added so far
+        self.exports = []
+        # Weeks the questionnaires added in this run fall in, only these rows change in the release
+        self.updated_weeks = set()
+        self.updated_iso_weeks = set()
+
+    def add(self, chunk):
+        self.questionnaires += len(chunk)
+        dates = pd.to_datetime(chunk["date"], format="%Y-%m-%d")
+
+        week = dates.dt.to_period("W-SUN").dt.end_time.dt.normalize().rename("week")
+        symptoms = chunk[SYMPTOMS].assign(questionnaires=1).groupby(week).sum()
+        self.symptoms = accumulate(self.symptoms, symptoms)
+        self.updated_weeks.update(symptoms.index)
+
+        iso = dates.dt.isocalendar()
+        cases = chunk[list(CASE_DEFINITIONS.values())].assign(questionnaires=1).groupby([iso["year"], iso["week"]]).sum()
+        self.cases = accumulate(self.cases, cases)
+        self.updated_iso_weeks.update(cases.index)
+
+        latest = chunk[["participant", "province", "sex", "age"]].assign(date=dates)
+        if self.participants is not None:
+            latest = pd.concat([self.participants, latest.astype({"province": "str", "sex": "str"})])
+        latest = latest.sort_values("date", kind="stable").drop_duplicates("participant", keep="last")
+        self.participants = latest.astype({"province": "str", "sex": "str"})
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.symptoms.to_parquet(os.path.join(directory, "symptoms.parquet"))
+        self.cases.to_parquet(os.path.join(directory, "cases.parquet"))
+        self.participants.to_parquet(os.path.join(directory, "participants.parquet"), index=False)
+        # Written last, a run that fails halfway leaves the previous state in place
+        with open(os.path.join(directory, "state.json.tmp"), "w") as f:
+            json.dump({"questionnaires": self.questionnaires, "exports": self.exports}, f, indent=2)
+        os.replace(os.path.join(directory, "state.json.tmp"), os.path.join(directory, "state.json"))
+
+    @classmethod
+    def load(cls, directory):
+        aggregator = cls()
+        if not os.path.exists(os.path.join(directory, "state.json")):
+            return aggregator
+        with open(os.path.join(directory, "state.json")) as f:
+            state = json.load(f)
+        aggregator.questionnaires = state["questionnaires"]
+        aggregator.exports = state["exports"]
+        aggregator.symptoms = pd.read_parquet(os.path.join(directory, "symptoms.parquet"))
+        aggregator.cases = pd.read_parquet(os.path.join(directory, "cases.parquet"))
+        aggregator.participants = pd.read_parquet(os.path.join(directory, "participants.parquet"))
+        return aggregator
+
+    def symptoms_frame(self, names, weeks=None):
+        totals = self.symptoms.sort_index()
+        if weeks is not None:
+            totals = totals[totals.index.isin(weeks)]
+        frequentie = totals[SYMPTOMS].div(totals["questionnaires"], axis=0).mul(100).round(2)
+        frame = frequentie.rename(columns=names).rename_axis(columns="symptom").stack().rename("frequentie").reset_index()
+        # Most reported symptoms first within every week
+        frame = frame.sort_values(["week", "frequentie"], ascending=[True, False], kind="stable")
+        return frame[["symptom", "frequentie", "week"]]
+
+    def incidence_frame(self, name, season_start_week=None, weeks=None):
+        totals = self.cases.sort_index()
+        if weeks is not None:
+            totals = totals[totals.index.isin(weeks)]
+        year = totals.index.get_level_values("year").to_numpy()
+        week = totals.index.get_level_values("week").to_numpy()
+        if season_start_week is None:
+            # Calendar years, "2023-2024" is 2024
+            start, order = year - 1, week
+        else:
+            start = np.where(week >= season_start_week, year, year - 1)
+            # Weeks in season order: from the start week to the end of the year, then the next year's weeks
+            order = np.where(week >= season_start_week, week, week + 53)
+        frame = pd.DataFrame({
+            "year": [f"{season}-{season + 1}" for season in start],
+            "week": week,
+            "incidentie": (1000 * totals[CASE_DEFINITIONS[name]] / totals["questionnaires"]).round(1).to_numpy(),
+        })
+        return frame.iloc[np.lexsort((order, start))]
+
+    def provinces_frame(self, population, names):
+        participants = self.participants["province"].value_counts().reindex(population.index, fill_value=0)
+        return pd.DataFrame({
+            "province": population.index.map(names),
+            "deelnemersper1000": (1000 * participants / population).round(2).to_numpy(),
+        })
+
+    def sexage_frame(self, names):
+        participants = self.participants[self.participants["sex"].isin(names)]
+        age = pd.cut(participants["age"], AGE_BINS, right=False, labels=AGE_GROUPS)
+        counts = participants.groupby([participants["sex"], age], observed=False).size()
+        counts = counts.reindex(pd.MultiIndex.from_product([list(names), AGE_GROUPS]), fill_value=0)
+        return pd.DataFrame({
+            "age": counts.index.get_level_values(1),
+            "sex": counts.index.get_level_values(0).map(names),
+            "count": counts.to_numpy(),
+        })
+
+
+def season_order(season_start_week=None):
+    """Sort key for the rows of a flulike/covidlike csv: season, then weeks in season order."""
+    def key(rows):
+        week = rows["week"].astype(int)
+        if season_start_week is not None:
+            week = week.where(week >= season_start_week, week + 53)
+        return rows["year"] + week.astype(str).str.zfill(2)
+    return key
+
+
+def read_exports(paths, chunksize):
+    for path in paths:
+        yield from pd.read_csv(path, usecols=list(DTYPES), dtype=DTYPES, chunksize=chunksize)
+
+
+def province_names(geojson_path):
+    """English province name -> {province_key: name}, from the province GeoJSON the maps use."""
+    with open(geojson_path, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    return {feature["properties"]["name-english"]: feature["properties"] for feature in features}
+
+
+def write_csv(frame, path):
+    frame.to_csv(path + ".tmp", index=False, date_format=WEEK_FORMAT)
+    os.replace(path + ".tmp", path)
+
+
+def update_csv(frame, path, keys, order):
+    """Replace the rows of the weeks in frame in the csv at path and append the new ones, other rows are kept as they are."""
+    if not os.path.exists(path):
+        return write_csv(frame, path)
+    # Everything as text, so the rows that stay are written back exactly as they were
+    existing = pd.read_csv(path, dtype=str, keep_default_na=False)
+    rows = pd.read_csv(io.StringIO(frame.to_csv(index=False, date_format=WEEK_FORMAT)), dtype=str, keep_default_na=False)
+    stale = existing.set_index(keys).index.isin(rows.set_index(keys).index)
+    merged = pd.concat([existing[~stale], rows], ignore_index=True)
+    merged = merged.iloc[np.argsort(order(merged).to_numpy(), kind="stable")]
+    write_csv(merged, path)
+
+
+def write_release(aggregator, population, provinces, output, incremental=False):
+    for locale, spec in i18n.LOCALES.items():
+        values = i18n.catalog(locale)["values"]
+        names = {english: properties[spec["province_key"]] for english, properties in provinces.items()}
+        season_start_weeks = spec.get("season_start_weeks", {})
+        directory = os.path.join(output, locale)
+        os.makedirs(directory, exist_ok=True)
+
+        # Participants are counted over all time, these two are small and always written in full
+        write_csv(aggregator.provinces_frame(population, names), os.path.join(directory, "provinces.csv"))
+        write_csv(aggregator.sexage_frame(values["sex"]), os.path.join(directory, "sexage.csv"))
+
+        if not incremental:
+            write_csv(aggregator.symptoms_frame(values["symptom"]), os.path.join(directory, "symptoms.csv"))
+            for name in CASE_DEFINITIONS:
+                write_csv(aggregator.incidence_frame(name, season_start_weeks.get(name)), os.path.join(directory, f"{name}.csv"))
+            continue
+        update_csv(
+            aggregator.symptoms_frame(values["symptom"], aggregator.updated_weeks),
+            os.path.join(directory, "symptoms.csv"), ["week"], lambda rows: rows["week"],
+        )
+        for name in CASE_DEFINITIONS:
+            update_csv(
+                aggregator.incidence_frame(name, season_start_weeks.get(name), aggregator.updated_iso_weeks),
+                os.path.join(directory, f"{name}.csv"), ["year", "week"], season_order(season_start_weeks.get(name)),
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate raw questionnaire exports into data/<locale>/*.csv")
+    parser.add_argument("exports", nargs="+")
+    parser.add_argument("--population", required=True, help="csv with the population of every province")
+    parser.add_argument("--output", default=os.getenv("DATA_DIR", "data"))
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--state", default=STATE_DIR, help="directory the running totals are saved in")
+    parser.add_argument("--incremental", action="store_true",
+                        help="add the exports to the saved totals and only update the weeks they touch")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    population = pd.read_csv(args.population, index_col="province")["population"]
+    provinces = province_names(os.path.join(args.output, "provinces.geojson"))
+
+    aggregator = Aggregator.load(args.state) if args.incremental else Aggregator()
+    exports = [path for path in args.exports if os.path.basename(path) not in aggregator.exports]
+    for path in sorted(set(args.exports) - set(exports)):
+        print(f"Skipping {path}, it was already added")
+    if not exports:
+        return
+
+    for chunk in read_exports(exports, args.chunksize):
+        aggregator.add(chunk)
+        print(f"{aggregator.questionnaires} questionnaires, {len(aggregator.participants)} participants")
+    aggregator.exports += [os.path.basename(path) for path in exports]
+
+    # Without saved totals the existing files can't be updated, they're written from scratch
+    write_release(aggregator, population, provinces, args.output, incremental=args.incremental and len(aggregator.exports) > len(exports))
+    aggregator.save(args.state)
+    manifest = {
+        "generated": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "exports": aggregator.exports,
+        "questionnaires": aggregator.questionnaires,
+        "participants": len(aggregator.participants),
+    }
+    with open(os.path.join(args.output, "manifest.json.tmp"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(os.path.join(args.output, "manifest.json.tmp"), os.path.join(args.output, "manifest.json"))
+    print(f"Wrote the release for {', '.join(i18n.LOCALES)} to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
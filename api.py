@@ -0,0 +1,161 @@
+# Read-only data API for partners who want the numbers behind the dashboard, on app.server so it
+# doesn't go through Dash callbacks or figure serialization:
+#
+#   /api/v1/                                   the datasets, their columns and the data version
+#   /api/v1/<locale>/<dataset>                 e.g. /api/v1/nl/flulike?season=2023-2024&columns=week,incidentie
+#
+# Query parameters:
+#   week      only these weeks (comma separated): YYYY/MM/DD for symptoms, week numbers for flulike/covidlike
+#   season    only these seasons, e.g. 2022-2023 (flulike/covidlike)
+#   columns   only these columns, in this order
+#   limit     rows per page (default 1000, at most MAX_LIMIT), offset: rows to skip
+#   format    json (default) or csv
+#
+# The datasets are prepared once per data release, and rendered responses are cached per release. Every
+# response has an ETag derived from the release and the query, so unchanged data is answered with a 304.
+import hashlib
+import os
+from urllib.parse import urlencode
+
+import orjson
+from flask import Response, request
+
+import datastore
+import i18n
+from figure_cache import LRUCache
+
+DATASETS = datastore.DATASETS
+# Query parameter -> column it filters on
+FILTERS = {"week": "week", "season": "year"}
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10000
+
+# Rendered responses, keyed on the release so a new release never serves old data
+responses = LRUCache("api", maxsize=int(os.getenv("API_CACHE_SIZE", 256)))
+
+
+class BadRequest(Exception):
+    pass
+
+
+def prepare(locale, release):
+    """The locale's datasets as the API shows them: weeks as written in the csv files, labels as text."""
+    frames = {}
+    for name in DATASETS:
+        frame = release.frames[locale][name]
+        if name == "symptoms" and "week" in frame:
+            frame = frame.assign(week=frame["week"].dt.strftime(datastore.WEEK_FORMAT))
+        frames[name] = frame.astype({column: str for column in frame.select_dtypes("category").columns})
+    return frames
+
+
+def select(frame, args):
+    for parameter, column in FILTERS.items():
+        if parameter not in args:
+            continue
+        if column not in frame:
+            raise BadRequest(f"{parameter} can't be used on this dataset")
+        values = args[parameter].split(",")
+        if parameter == "week" and frame[column].dtype.kind in "iu":
+            try:
+                values = [int(value) for value in values]
+            except ValueError:
+                raise BadRequest("week must be week numbers for this dataset")
+        elif parameter == "week":
+            values = [value.replace("-", "/") for value in values]
+        frame = frame[frame[column].isin(values)]
+
+    if "columns" in args:
+        columns = args["columns"].split(",")
+        unknown = [column for column in columns if column not in frame]
+        if unknown:
+            raise BadRequest(f"Unknown columns: {', '.join(unknown)}")
+        frame = frame[columns]
+    return frame
+
+
+def page(args):
+    try:
+        limit = int(args.get("limit", DEFAULT_LIMIT))
+        offset = int(args.get("offset", 0))
+    except ValueError:
+        raise BadRequest("limit and offset must be numbers")
+    if not 0 < limit <= MAX_LIMIT or offset < 0:
+        raise BadRequest(f"limit must be between 1 and {MAX_LIMIT}, offset can't be negative")
+    return limit, offset
+
+
+def render(locale, name, release, args):
+    """(body, mimetype, headers) of a dataset request."""
+    fmt = args.get("format", "json")
+    if fmt not in ("json", "csv"):
+        raise BadRequest("format must be json or csv")
+    limit, offset = page(args)
+    frame = select(datastore.get(f"{locale}-api", release)[name], args)
+    total = len(frame)
+    rows = frame.iloc[offset:offset + limit]
+
+    # Relative, the response is cached for every host and scheme the API is reached on
+    next_url = None
+    if offset + limit < total:
+        next_url = f"{request.script_root}{request.path}?{urlencode(dict(args, offset=offset + limit))}"
+    headers = {"X-Total-Count": str(total)}
+    if next_url:
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    if fmt == "csv":
+        return rows.to_csv(index=False), "text/csv", headers
+    body = orjson.dumps({
+        "version": release.version,
+        "locale": locale,
+        "dataset": name,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next": next_url,
+        "data": rows.to_dict("records"),
+    }, option=orjson.OPT_SERIALIZE_NUMPY)
+    return body, "application/json", headers
+
+
+def error(status, message):
+    return Response(orjson.dumps({"error": message}), status=status, mimetype="application/json")
+
+
+def init_app(app, max_age):
+    """Serve the datasets of the current release on /api/v1/."""
+
+    def conditional(response, release, key):
+        response.set_etag(f"{release.version}-{hashlib.sha1(repr(key).encode()).hexdigest()[:12]}")
+        response.last_modified = release.modified
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        return response.make_conditional(request)
+
+    def index_view():
+        release = datastore.current()
+        index = {
+            "version": release.version,
+            "locales": list(i18n.LOCALES),
+            "datasets": {name: list(release.frames[next(iter(i18n.LOCALES))][name].columns) for name in DATASETS},
+        }
+        return conditional(Response(orjson.dumps(index), mimetype="application/json"), release, "index")
+
+    def dataset_view(locale, name):
+        if locale not in i18n.LOCALES or name not in DATASETS:
+            return error(404, "Unknown locale or dataset")
+        release = datastore.current()
+        args = request.args.to_dict()
+        key = (locale, name, tuple(sorted(args.items())))
+        try:
+            body, mimetype, headers = responses.get_or_build((*key, release.version), lambda: render(locale, name, release, args))
+        except BadRequest as e:
+            return error(400, str(e))
+        return conditional(Response(body, mimetype=mimetype, headers=headers), release, key)
+
+    app.server.add_url_rule("/api/v1/", "api_index", index_view)
+    app.server.add_url_rule("/api/v1/<locale>/<name>", "api_dataset", dataset_view)
+
+
+for locale in i18n.LOCALES:
+    datastore.register_builder(f"{locale}-api", lambda release, locale=locale: prepare(locale, release))
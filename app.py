@@ -1,26 +1,41 @@
 # Run this app with `python app.py` and
 # visit http://127.0.0.1:8050/ in your web browser.
+import logging
 import os
+import time
 
 import dash
+from flask import request
 
 from dotenv import load_dotenv
 load_dotenv()
 
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(process)d] [%(levelname)s] %(name)s: %(message)s")
+
+import api
+import datastore
+import i18n
+import images
+import metrics
+import static_assets
+
+logger = logging.getLogger(__name__)
+
+start = time.perf_counter()
 app = dash.Dash(
     __name__,
-    external_scripts=
-        [
-            {
-                'src':'https://cdn.jsdelivr.net/npm/@iframe-resizer/child',
-                'type':'text/javascript',
-                'async': True
-            }
-        ],
+    # iframe-resizer is served from assets/vendor/ once static_assets.py vendored it, from the CDN until then
+    external_scripts=static_assets.external_scripts(),
     use_pages=True,
     suppress_callback_exceptions=True, # Optimizing initial loading times
+    compress=True, # gzip/brotli responses through flask-compress
 )
 server = app.server
+# Importing the pages only registers them, their figures are built on first request
+datastore.timings["import pages"] = time.perf_counter() - start
+logger.info("Startup times: %s", datastore.startup_report())
+
+metrics.init_app(app, [spec["path"] for spec in i18n.LOCALES.values()])
 
 app.layout = dash.html.Div(
         dash.page_container, 
@@ -33,7 +48,38 @@ def modify_headers(response):
     response.headers['Content-Security-Policy'] = f"frame-ancestors {os.getenv('CSP_FRAME_SRC')}"
     return response
 
+# Let browsers and the reverse proxy reuse the layout and dependencies between data releases. Only
+# these two: the page content itself still comes through the pages callback, an uncacheable POST, and
+# other JSON like Dash's hot-reload poll (/_reload-hash) must not be cached. The html index carries a
+# per-request id in its config, Dash already caches its fingerprinted component bundles and callbacks
+# are POSTs, so those are only compressed.
+HTTP_MAX_AGE = int(os.getenv("HTTP_MAX_AGE", 300))
+CACHED_PATHS = {app.config.routes_pathname_prefix + path for path in ("_dash-layout", "_dash-dependencies")}
+
+@app.server.after_request
+def add_cache_headers(response):
+    if (
+        request.method not in ("GET", "HEAD")
+        or request.path not in CACHED_PATHS
+        or response.status_code != 200
+    ):
+        return response
+    # The body hash also changes when a deploy changes the code, the data version alone wouldn't
+    response.add_etag()
+    response.last_modified = datastore.current().modified
+    response.cache_control.public = True
+    response.cache_control.max_age = HTTP_MAX_AGE
+    # flask-compress handles If-None-Match for compressed responses, this covers the uncompressed ones
+    return response.make_conditional(request)
+
+api.init_app(app, HTTP_MAX_AGE)
+images.init_app(app, HTTP_MAX_AGE)
+static_assets.init_app(app)
+
 if __name__ == "__main__":
+    # Pick up new data releases without restarting (under gunicorn the master watches instead and replaces
+    # the workers after a new release, see gunicorn.conf.py)
+    datastore.start_watcher()
     # local dev
     app.run(debug=True)
     # production
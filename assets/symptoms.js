@@ -0,0 +1,18 @@
+// Swap the symptom bars for the selected week without a round-trip to the server,
+// the data for every week is shipped once in the "symptoms-weeks" store.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    symptoms: {
+        switch_week: function(week, weeks, figure) {
+            if (!weeks || !figure) {
+                return window.dash_clientside.no_update;
+            }
+            const snapshot = weeks[week];
+            const trace = Object.assign({}, figure.data[0], {
+                x: snapshot.frequentie,
+                y: snapshot.symptom,
+                marker: Object.assign({}, figure.data[0].marker, {color: snapshot.frequentie}),
+            });
+            return Object.assign({}, figure, {data: [trace]});
+        }
+    }
+});
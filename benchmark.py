@@ -0,0 +1,215 @@
+# Benchmarks for startup, page payloads and the symptom callback (which only runs when the week slider
+# is moved, pages load with the latest week's figure), using Flask's test client on app.server.
+#
+#   python benchmark.py [--rounds 20] [--output build/benchmarks/<timestamp>.json] [--compare previous.json]
+#
+# Results are written as JSON. With --compare the run is checked against an earlier result file and
+# the script exits with status 1 if a timing or payload got more than --threshold (default 20%) worse.
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+COLD_IMPORT = "import time; start = time.perf_counter(); import app; print(time.perf_counter() - start)"
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def summarize(seconds):
+    return {
+        "p50_ms": percentile(seconds, 0.50) * 1000,
+        "p99_ms": percentile(seconds, 0.99) * 1000,
+        "mean_ms": statistics.mean(seconds) * 1000,
+        "count": len(seconds),
+    }
+
+
+def cold_import(rounds):
+    # A fresh interpreter every time, otherwise the modules are already imported
+    seconds = []
+    for _ in range(rounds):
+        output = subprocess.run([sys.executable, "-c", COLD_IMPORT], capture_output=True, text=True, check=True).stdout
+        seconds.append(float(output.strip().splitlines()[-1]))
+    return summarize(seconds)
+
+
+def timed(request):
+    start = time.perf_counter()
+    response = request()
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, f"{response.status_code}: {response.data[:200]}"
+    return elapsed, response
+
+
+def pages_callback(client):
+    # The callback Dash pages uses to render a page's layout for the current url
+    for dependency in json.loads(client.get("/_dash-dependencies").data):
+        if any(i["id"] == "_pages_location" and i["property"] == "pathname" for i in dependency["inputs"]):
+            return dependency
+    raise RuntimeError("Dash pages callback not found")
+
+
+def callback_body(dependency, values):
+    outputs = [
+        {"id": output.split(".")[0], "property": output.split(".")[1]}
+        for output in dependency["output"].strip(".").split("...")
+    ]
+    return {
+        "output": dependency["output"],
+        "outputs": outputs if len(outputs) > 1 else outputs[0],
+        "inputs": [dict(i, value=values.get((i["id"], i["property"]))) for i in dependency["inputs"]],
+        "state": [dict(s, value=values.get((s["id"], s["property"]))) for s in dependency["state"]],
+        "changedPropIds": [],
+    }
+
+
+def bench_pages(client, rounds):
+    import i18n
+
+    dependency = pages_callback(client)
+    results = {}
+    for locale, spec in i18n.LOCALES.items():
+        body = callback_body(dependency, {("_pages_location", "pathname"): spec["path"], ("_pages_location", "search"): ""})
+        # The first request builds the figures, the following ones are served from the datastore
+        first, response = timed(lambda: client.post("/_dash-update-component", json=body))
+        seconds = [timed(lambda: client.post("/_dash-update-component", json=body))[0] for _ in range(rounds)]
+        compressed = client.post("/_dash-update-component", json=body, headers={"Accept-Encoding": "gzip"})
+        results[spec["path"]] = {
+            "first_request_ms": first * 1000,
+            "layout_bytes": len(response.data),
+            "layout_gzip_bytes": len(compressed.data),
+            **summarize(seconds),
+        }
+
+    layout_seconds = []
+    for _ in range(rounds):
+        elapsed, response = timed(lambda: client.get("/_dash-layout"))
+        layout_seconds.append(elapsed)
+    results["/_dash-layout"] = {"layout_bytes": len(response.data), **summarize(layout_seconds)}
+    return results
+
+
+def bench_symptoms_callback(client, rounds):
+    import datastore
+    import i18n
+
+    dependencies = [d for d in json.loads(client.get("/_dash-dependencies").data) if d["output"] == "symptoms.figure"]
+    if not dependencies or dependencies[0]["clientside_function"]:
+        return None  # CLIENTSIDE_SYMPTOMS, nothing to measure on the server
+
+    results = {}
+    for locale in i18n.LOCALES:
+        weeks = datastore.get(locale)["symptom_weeks"]
+        if len(weeks) < 2:
+            continue
+        seconds, sizes = [], []
+        for _ in range(rounds):
+            for week in range(len(weeks)):
+                body = callback_body(dependencies[0], {
+                    ("filter-symptom-week--slider", "value"): week,
+                    ("page-locale", "data"): locale,
+                })
+                elapsed, response = timed(lambda: client.post("/_dash-update-component", json=body))
+                seconds.append(elapsed)
+                sizes.append(len(response.data))
+        results[locale] = {"weeks": len(weeks), "mean_response_bytes": statistics.mean(sizes), **summarize(seconds)}
+    return results
+
+
+def run(rounds):
+    results = {"cold_import": cold_import(max(3, rounds // 4))}
+
+    start = time.perf_counter()
+    import app
+    import datastore
+    results["import_s"] = time.perf_counter() - start
+
+    client = app.server.test_client()
+    results["pages"] = bench_pages(client, rounds)
+    results["update_symptoms_plot"] = bench_symptoms_callback(client, rounds)
+    results["build_s"] = dict(datastore.timings)
+    # ru_maxrss is in kB on Linux
+    results["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return results, datastore.current().version
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in (results or {}).items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(results, previous, threshold):
+    """Print the metrics that got worse by more than threshold, returns True if there were any."""
+    before = flatten(previous["results"])
+    after = flatten(results)
+    regressions = []
+    for name, value in after.items():
+        # Counts are not better or worse, everything else is time, bytes or memory where lower is better
+        if name.endswith(".count") or name.endswith(".weeks") or not before.get(name):
+            continue
+        change = (value - before[name]) / before[name]
+        if change > threshold:
+            regressions.append((name, before[name], value, change))
+    for name, old, new, change in regressions:
+        print(f"REGRESSION {name}: {old:.2f} -> {new:.2f} (+{change:.0%})")
+    return bool(regressions)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark startup, page payloads and callback latency")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--output")
+    parser.add_argument("--compare", help="earlier result file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    import dash
+
+    results, version = run(args.rounds)
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "data_version": version,
+        "python": platform.python_version(),
+        "dash": dash.__version__,
+        "rounds": args.rounds,
+        "results": results,
+    }
+
+    output = args.output or os.path.join("build", "benchmarks", f"{report['timestamp'].replace(':', '')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Wrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(results, json.load(f), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Convert the weekly release's csv files to typed Parquet files next to them, with the column types
+# declared in datastore.SCHEMAS. Every Parquet file records the size and modification time of its csv,
+# and the datastore only reads it instead of the csv while those still match, so a release published
+# as csv only is still picked up (however its files were copied).
+#
+#   python convert_data.py [--data data]
+import argparse
+import os
+
+import datastore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert data/<locale>/*.csv to typed Parquet files")
+    parser.add_argument("--data", default=datastore.DATA_DIR)
+    args = parser.parse_args()
+
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    for locale in datastore.LOCALES:
+        for name in datastore.DATASETS + datastore.OPTIONAL_DATASETS:
+            csv = os.path.join(args.data, locale, f"{name}.csv")
+            if name in datastore.OPTIONAL_DATASETS and not os.path.exists(csv):
+                continue
+            parquet = os.path.join(args.data, locale, f"{name}.parquet")
+            frame = datastore.read_dataset(csv, name)
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            table = table.replace_schema_metadata({**table.schema.metadata, datastore.PARQUET_SOURCE_KEY: datastore.source_stamp(csv)})
+            pq.write_table(table, parquet + ".tmp", compression="zstd")
+            os.replace(parquet + ".tmp", parquet)
+            untyped = pd.read_csv(csv).memory_usage(deep=True).sum()
+            typed = frame.memory_usage(deep=True).sum()
+            print(f"{parquet}: {os.path.getsize(csv)} -> {os.path.getsize(parquet)} bytes on disk, {untyped} -> {typed} bytes in memory")
+
+
+if __name__ == "__main__":
+    main()
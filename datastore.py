@@ -0,0 +1,263 @@
+# Central store for the weekly data release. Every locale's csv files and the province GeoJSON
+# are read once when this module is imported. With gunicorn's preload_app (see gunicorn.conf.py)
+# that happens in the master process, so the workers share these objects copy-on-write.
+#
+# Pages must treat the frames as read-only: writing to them (or adding columns) would copy the
+# memory pages into every worker again. Derive a new frame instead, e.g. df.astype({...}).
+#
+# A new weekly release can be published without restarting the server: a watcher thread polls the
+# data directory, loads the new release and builds everything the pages registered with
+# register_builder in the background, and only then swaps it in. Requests always see one complete
+# release, either the old or the new one. Derived things (figures) are only built when first
+# requested, so a worker only pays for the pages it actually serves.
+#
+# Under gunicorn the watcher runs in the master (see gunicorn.conf.py), which then replaces the
+# workers one by one: the new ones fork from the master and share the new release like the first
+# workers shared the first one. A watcher in every worker would load a private copy per worker.
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+import geometry
+import i18n
+import maps
+
+DATA_DIR = os.getenv("DATA_DIR", "data")
+# Seconds between checks for a new release, 0 disables the watcher
+RELOAD_INTERVAL = float(os.getenv("DATA_RELOAD_INTERVAL", 60))
+
+LOCALES = list(i18n.LOCALES)
+DATASETS = ["symptoms", "flulike", "covidlike", "provinces", "sexage"]
+# Only read when the release has them, see maps.py
+OPTIONAL_DATASETS = ["municipalities"]
+
+# Column types of every dataset. Repeated labels are categoricals, which keeps the frames small as the
+# history grows. Symptom weeks are the date the week was reported; the flu-like and COVID-like weeks
+# are week numbers within the season in "year", so they stay small integers. Values stay float64,
+# float32 would show rounding noise like 8.119999885 in the hover labels.
+SCHEMAS = {
+    "symptoms": {"symptom": "category", "frequentie": "float64", "week": "datetime64[ns]"},
+    "flulike": {"year": "category", "week": "int16", "incidentie": "float64"},
+    "covidlike": {"year": "category", "week": "int16", "incidentie": "float64"},
+    "provinces": {"province": "category", "deelnemersper1000": "float64"},
+    "sexage": {"age": "category", "sex": "category", "count": "int32"},
+    # incidentie (flu-like incidence per 1000 participants) is optional, the map offers it when it's there
+    "municipalities": {"nis": "int32", "deelnemersper1000": "float64", "incidentie": "float64"},
+}
+# How the dates are written in the csv files
+WEEK_FORMAT = "%Y/%m/%d"
+# Parquet metadata key holding the source_stamp of the csv a Parquet file was converted from
+PARQUET_SOURCE_KEY = b"source_csv"
+
+logger = logging.getLogger(__name__)
+
+
+class Release:
+    def __init__(self, version, frames, provinces_geojson, modified, municipalities=None):
+        self.version = version
+        self.frames = frames
+        self.provinces_geojson = provinces_geojson
+        # maps.MultiResolutionMap, None if the release has no municipality geometry
+        self.municipalities = municipalities
+        # Unix time of the newest data file, used for Last-Modified
+        self.modified = modified
+        # Figures and other things derived from this release, see register_builder
+        self.derived = {}
+
+
+def source_stamp(path):
+    """Size and modification time of a csv file, convert_data.py stores it in the Parquet file made from it."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def dataset_path(locale, name):
+    """The Parquet file written by convert_data.py if it was made from the csv as it is now.
+
+    Comparing modification times isn't enough: a release copied with rsync -a or cp -p keeps older
+    times than Parquet files converted at image build time.
+    """
+    import pyarrow.parquet as pq
+
+    csv = os.path.join(DATA_DIR, locale, f"{name}.csv")
+    parquet = os.path.join(DATA_DIR, locale, f"{name}.parquet")
+    if not os.path.exists(parquet):
+        return csv
+    if not os.path.exists(csv):
+        return parquet
+    metadata = pq.read_schema(parquet).metadata or {}
+    return parquet if metadata.get(PARQUET_SOURCE_KEY) == source_stamp(csv).encode() else csv
+
+
+def data_files():
+    paths = [os.path.join(DATA_DIR, "provinces.geojson")]
+    paths += [dataset_path(locale, name) for locale in LOCALES for name in DATASETS]
+    optional = [os.path.join(DATA_DIR, "municipalities.geojson")]
+    optional += [dataset_path(locale, name) for locale in LOCALES for name in OPTIONAL_DATASETS]
+    return paths + [path for path in optional if os.path.exists(path)]
+
+
+def release_version():
+    """Identify the release on disk.
+
+    If the publisher writes a manifest.json (after copying all the csv files), its contents are the
+    version, so half-copied releases are never picked up. Otherwise fall back to the modification
+    times of the data files.
+    """
+    manifest = os.path.join(DATA_DIR, "manifest.json")
+    digest = hashlib.sha1()
+    if os.path.exists(manifest):
+        with open(manifest, "rb") as f:
+            digest.update(f.read())
+    else:
+        for path in data_files():
+            digest.update(f"{path}:{os.stat(path).st_mtime_ns}".encode())
+    # The geometry settings change the map figures too
+    digest.update(f"{geometry.TOLERANCE}:{geometry.PRECISION}:{maps.TOLERANCES}".encode())
+    return digest.hexdigest()[:12]
+
+
+def read_dataset(path, name):
+    if path.endswith(".parquet"):
+        # Already typed, see convert_data.py
+        return pd.read_parquet(path)
+    schema = SCHEMAS[name]
+    frame = pd.read_csv(path, dtype={column: dtype for column, dtype in schema.items() if dtype not in ("category", "datetime64[ns]")})
+    for column, dtype in schema.items():
+        if column not in frame:
+            continue
+        if dtype == "category":
+            # Categories in file order, plotly express orders legends and colors by them
+            frame[column] = frame[column].astype(pd.CategoricalDtype(frame[column].unique()))
+        elif dtype == "datetime64[ns]":
+            frame[column] = pd.to_datetime(frame[column], format=WEEK_FORMAT)
+    return frame
+
+
+def load_locale(locale):
+    frames = {name: read_dataset(dataset_path(locale, name), name) for name in DATASETS}
+    for name in OPTIONAL_DATASETS:
+        if os.path.exists(dataset_path(locale, name)):
+            frames[name] = read_dataset(dataset_path(locale, name), name)
+    return frames
+
+
+def load_geojson():
+    # Simplified and stripped down to the province name properties the maps match on, see geometry.py
+    keep_properties = {spec["province_key"] for spec in i18n.LOCALES.values()}
+    return geometry.load(os.path.join(DATA_DIR, "provinces.geojson"), keep_properties=keep_properties)
+
+
+def load_release(version=None):
+    version = version or release_version()
+    modified = max(os.path.getmtime(path) for path in data_files())
+    return Release(version, {locale: load_locale(locale) for locale in LOCALES}, load_geojson(), modified, maps.load(DATA_DIR))
+
+
+_builders = {}
+_current = load_release()
+_lock = threading.Lock()
+_build_lock = threading.RLock()
+
+
+def _reset_locks():
+    # A worker forked while the master's watcher was loading a release would inherit the locks held
+    global _lock, _build_lock
+    _lock = threading.Lock()
+    _build_lock = threading.RLock()
+
+
+os.register_at_fork(after_in_child=_reset_locks)
+
+# Seconds the last build of every registered builder (and the page import, see app.py) took
+timings = {}
+
+
+def current():
+    return _current
+
+
+def register_builder(name, build):
+    """Register build(release) to derive something (e.g. a page's figures) from every release.
+
+    Nothing is built until the first get(name). After that, every new release builds it in the
+    background before the release is swapped in, so only things that are actually used get built.
+    """
+    _builders[name] = build
+
+
+def _build(name, release):
+    start = time.perf_counter()
+    value = _builders[name](release)
+    timings[name] = time.perf_counter() - start
+    logger.info("Built %s for release %s in %.3fs", name, release.version, timings[name])
+    return value
+
+
+def get(name, release=None):
+    release = release or _current
+    if name not in release.derived:
+        with _build_lock:
+            if name not in release.derived:
+                release.derived[name] = _build(name, release)
+    return release.derived[name]
+
+
+def reload(force=False):
+    """Load the release on disk if it differs from the current one, returns True if swapped."""
+    global _current
+    with _lock:
+        version = release_version()
+        if version == _current.version and not force:
+            return False
+        release = load_release(version)
+        for name in list(_current.derived):
+            get(name, release)
+        _current = release
+    logger.info("Switched to data release %s", version)
+    return True
+
+
+def startup_report():
+    return ", ".join(f"{name} {seconds:.3f}s" for name, seconds in timings.items())
+
+
+def _watch(interval, on_reload):
+    while True:
+        time.sleep(interval)
+        try:
+            swapped = reload()
+        except Exception:
+            # Most likely a release that is still being copied, keep serving the current one
+            logger.exception("Failed to load new data release, keeping %s", _current.version)
+            continue
+        if swapped and on_reload is not None:
+            on_reload()
+
+
+def start_watcher(interval=RELOAD_INTERVAL, on_reload=None):
+    """Watch for new releases in a thread, calling on_reload() after one is swapped in."""
+    if interval <= 0:
+        return None
+    thread = threading.Thread(target=_watch, args=(interval, on_reload), name="datastore-watcher", daemon=True)
+    thread.start()
+    return thread
+
+
+def memory_usage():
+    """Resident and shared memory of the current process in kB, read from /proc (Linux only)."""
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                if key in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"):
+                    usage[key.lower()] = int(value.split()[0])
+    except OSError:
+        import resource
+        usage["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage
@@ -0,0 +1,52 @@
+# Shape-preserving downsampling for line charts with more points than are worth sending to the browser.
+#
+# Largest-Triangle-Three-Buckets (Steinarsson, 2013) splits the points into equal buckets and keeps
+# the point of every bucket that forms the largest triangle with the point kept before it and the
+# average of the next bucket, so peaks and dips survive where taking every n-th point would lose them.
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """Indices of the points of (x, y) to keep, at most threshold of them. x must be sorted."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # The first and last point are always kept, the others are split into threshold - 2 buckets
+    every = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, n)
+        next_x = x[end:next_end].mean()
+        next_y = y[end:next_end].mean()
+        # Twice the area of the triangles, the factor doesn't matter for the comparison
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        indices[bucket + 1] = previous
+    return indices
+
+
+def downsample(frame, positions, y, group, threshold):
+    """Downsample every group of rows of frame (the traces of a figure) to its share of threshold points.
+
+    positions are the x values of the rows as numbers (sorted within every group). Rows with a
+    missing y are gaps in the line and are always kept.
+    """
+    values = frame[y].to_numpy(dtype=float)
+    keep = []
+    for rows in frame.groupby(group, sort=False, observed=True).indices.values():
+        missing = np.isnan(values[rows])
+        points = rows[~missing]
+        share = max(3, threshold * len(rows) // len(frame))
+        keep.append(points[lttb(positions[points], values[points], share)])
+        keep.append(rows[missing])
+    return frame.iloc[np.sort(np.concatenate(keep))]
@@ -0,0 +1,141 @@
+# Render every locale's dashboard to a standalone html page, so the current release can be served
+# from plain nginx or a CDN without the Python server:
+#
+#   python export_static.py [--output build/static] [--plotlyjs inline|cdn]
+#
+# writes <output>/<page path>/index.html (e.g. build/static/nl-be/index.html). The figures are inlined,
+# the symptom week slider switches between precomputed weeks in the browser.
+import argparse
+import html
+import json
+import os
+
+import datastore
+import figures
+import i18n
+import static_assets
+from figures import colors
+
+PAGE = """<!DOCTYPE html>
+<html lang="{lang}">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<script src="{iframe_resizer}" async></script>
+<style>
+body {{ margin: 0; }}
+.page {{ background-color: {background}; padding: 0.5rem; font-family: Verdana, Geneva, sans-serif; color: {text}; }}
+.warning {{ color: {warning}; }}
+.slider {{ width: 85%; margin: auto; }}
+.slider input {{ width: 100%; }}
+.slider output {{ display: block; text-align: center; }}
+</style>
+</head>
+<body>
+<div class="page">
+{body}
+</div>
+</body>
+</html>
+"""
+
+# Swaps the symptom bars like the clientside callback on the Dash page (assets/symptoms.js)
+SLIDER_SCRIPT = """<script>
+(function() {{
+    var weeks = {weeks};
+    var data = {data};
+    var slider = document.getElementById("symptom-week");
+    var label = document.getElementById("symptom-week-label");
+    slider.addEventListener("input", function() {{
+        var snapshot = data[slider.value];
+        label.textContent = weeks[slider.value];
+        Plotly.restyle("symptoms", {{x: [snapshot.frequentie], y: [snapshot.symptom], "marker.color": [snapshot.frequentie]}});
+    }});
+}})();
+</script>"""
+
+
+def render_figure(figure, div_id, include_plotlyjs):
+    import plotly.io as pio
+
+    return pio.to_html(
+        figure,
+        full_html=False,
+        include_plotlyjs=include_plotlyjs,
+        div_id=div_id,
+        config={"responsive": True},
+    )
+
+
+def section(title, text, *content, padding="1rem"):
+    return (
+        f'<div style="padding-top: {padding}">\n'
+        f"<h2>{html.escape(title)}</h2>\n"
+        f"<p>{html.escape(text)}</p>\n" + "\n".join(content) + "\n</div>"
+    )
+
+
+def render_page(locale, release, plotlyjs="inline"):
+    texts = i18n.catalog(locale)["texts"]
+    page_figures = figures.load_figures(locale, release)
+    weeks = page_figures["symptom_weeks"]
+    has_slider = len(weeks) > 1
+    latest = len(weeks) - 1
+
+    # Plotly.js goes in once, with the first figure
+    include = {"inline": True, "cdn": "cdn"}[plotlyjs]
+    symptoms = [render_figure(figures.symptoms_figure(locale, release, latest), "symptoms", include)]
+    if has_slider:
+        symptoms.append(
+            f'<div class="slider"><input type="range" id="symptom-week" min="0" max="{latest}" step="1" value="{latest}">'
+            f'<output id="symptom-week-label">{figures.week_label(weeks[latest])}</output></div>'
+        )
+        symptoms.append(SLIDER_SCRIPT.format(weeks=json.dumps([figures.week_label(week) for week in weeks]), data=json.dumps(page_figures["symptom_week_data"])))
+
+    body = "\n".join([
+        f'<p class="warning">{html.escape(texts["last_updated"])}</p>',
+        f'<p>{html.escape(texts["intro"])}</p>',
+        section(texts["symptoms_title"], texts["symptoms_text"], *symptoms),
+        section(
+            texts["flulike_title"], texts["flulike_text"],
+            render_figure(page_figures["trendline_flu"], "trendline_flu", False),
+            padding="3rem" if has_slider else "1rem",
+        ),
+        section(texts["covidlike_title"], texts["covidlike_text"], render_figure(page_figures["trendline_covid"], "trendline_covid", False)),
+        section(
+            texts["participants_title"], texts["participants_text"],
+            render_figure(page_figures["province-map"], "province-map", False),
+            render_figure(page_figures["sexage"], "sexage", False),
+        ),
+    ])
+    return PAGE.format(
+        lang=locale,
+        title=html.escape(texts["symptoms_title"]),
+        background=colors["background"],
+        text=colors["text"],
+        warning=colors["warning-text"],
+        iframe_resizer=static_assets.VENDOR_SCRIPTS["iframe-resizer-child"]["url"],
+        body=body,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every locale's dashboard to static html")
+    parser.add_argument("--output", default="build/static")
+    parser.add_argument("--plotlyjs", choices=["inline", "cdn"], default="inline",
+                        help="inline plotly.js in every page (self-contained) or load it from the plotly CDN")
+    args = parser.parse_args()
+
+    release = datastore.current()
+    for locale, spec in i18n.LOCALES.items():
+        directory = os.path.join(args.output, spec["path"].strip("/"))
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "index.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_page(locale, release, args.plotlyjs))
+        print(f"{spec['path']}: {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
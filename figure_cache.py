@@ -0,0 +1,50 @@
+# Small in-process LRU cache for things that only depend on their key, e.g. (locale, week, data version)
+# for figures. Slider callbacks rebuild the same handful of figures over and over, so we keep the
+# most recently used ones around instead of calling plotly.express on every move.
+import os
+import threading
+from collections import OrderedDict
+
+import metrics
+
+
+class LRUCache:
+    def __init__(self, name, maxsize=64):
+        # name labels the cache in the dashboard_cache_requests_total metric
+        self.name = name
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                metrics.CACHE_REQUESTS.labels(self.name, "hit").inc()
+                return self._items[key]
+            self.misses += 1
+            metrics.CACHE_REQUESTS.labels(self.name, "miss").inc()
+
+        # Build outside the lock, worst case two threads build the same item once
+        item = build()
+
+        with self._lock:
+            self._items[key] = item
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return item
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+# Shared by every page with a week slider, keyed on (locale, week or selection, data version)
+figure_cache = LRUCache("figures", maxsize=int(os.getenv("FIGURE_CACHE_SIZE", 64)))
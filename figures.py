@@ -0,0 +1,451 @@
+# The dashboard figures for a locale and data release. The pages build them on first request, or load
+# them from the JSON files written by the offline build step:
+#
+#   python figures.py [--output build/figures] [--workers 4]
+#
+# which renders every figure of every locale for the current release, one process per locale. Loading
+# those files skips building the Plotly figure objects (and importing plotly.express) in the workers.
+import argparse
+import concurrent.futures
+import functools
+import os
+
+import numpy as np
+import orjson
+import pandas as pd
+
+import datastore
+import downsample
+import i18n
+
+FIGURE_DIR = os.getenv("FIGURE_DIR", "build/figures")
+
+# Trendlines with more points than this are drawn with WebGL and downsampled, see build_trendline
+TRENDLINE_MAX_POINTS = int(os.getenv("TRENDLINE_MAX_POINTS", 2000))
+
+# Figures that only depend on the release, the symptom bars also depend on the selected week
+STATIC_FIGURES = ["trendline_flu", "trendline_covid", "province-map", "sexage"]
+
+# What the municipality map can show, participation first: incidentie is optional in municipalities.csv
+MUNICIPALITY_MEASURES = ["deelnemersper1000", "incidentie"]
+
+# Page colors, shared by the Dash pages and the static export (export_static.py)
+colors = {"background": "#FFFFFF", "text": "#101010", "warning-text": "#FF4136"}
+
+
+class SymptomStore:
+    """A locale's symptom rows grouped by week, built once per release.
+
+    Everything a slider move needs is a list lookup, however many weeks of history there are.
+    """
+
+    def __init__(self, locale, release):
+        df_symptoms = release.frames[locale]["symptoms"]
+        if "week" in df_symptoms:
+            # Slider values need to be numeric so we need to map the dates to numbers, oldest week first
+            grouped = df_symptoms.groupby("week", sort=True, observed=True)
+            self.weeks = list(grouped.groups)
+            self.slices = [grouped.get_group(week) for week in self.weeks]
+        else:
+            # Locales without weekly history show the single week they have
+            self.weeks = [None]
+            self.slices = [df_symptoms]
+        # One scale for every week, so bars can be compared when moving the slider
+        self.max_frequentie = df_symptoms["frequentie"].max()
+        self.marks = {
+            i: {"label": week_label(week), "style": {"transform": "rotate(45deg)", "margin-top": "15px"}}
+            for i, week in enumerate(self.weeks)
+        }
+
+    def week_data(self):
+        # All weeks are only a few hundred rows, small enough to ship with the layout (indexed like the slider)
+        return [snapshot[["symptom", "frequentie"]].to_dict("list") for snapshot in self.slices]
+
+    def week_traces(self, index):
+        """What changes in the symptom bars from week to week, for trace_patch."""
+        snapshot = self.slices[index]
+        frequentie = snapshot["frequentie"].tolist()
+        return [{"x": frequentie, "y": snapshot["symptom"].tolist(), "marker.color": frequentie}]
+
+
+class SymptomMatrix:
+    """A locale's symptom frequencies as a dense symptom x week array, built once per release.
+
+    Selecting symptoms and a range of weeks is array indexing, so the explorer stays fast however
+    many weeks of history there are. Weeks are indexed like the symptom week slider.
+    """
+
+    def __init__(self, locale, release):
+        df_symptoms = release.frames[locale]["symptoms"]
+        self.weeks = symptom_store(locale, release).weeks
+        pivot = df_symptoms.pivot_table(
+            index="symptom", columns="week", values="frequentie", aggfunc="first", observed=True,
+        ).reindex(columns=self.weeks)
+        # Most reported symptoms first
+        pivot = pivot.loc[pivot.mean(axis=1).sort_values(ascending=False).index]
+        self.symptoms = [str(symptom) for symptom in pivot.index]
+        self.rows = {symptom: row for row, symptom in enumerate(self.symptoms)}
+        # NaN for weeks a symptom wasn't asked about
+        self.values = pivot.to_numpy(dtype=float)
+        self.max_frequentie = np.nanmax(self.values)
+
+    def select(self, symptoms=None, weeks=None):
+        """(symptoms, weeks, values) of the symptoms (all of them for None) in the (first, last) week indices."""
+        symptoms = [symptom for symptom in symptoms if symptom in self.rows] if symptoms is not None else self.symptoms
+        start, end = weeks if weeks is not None else (0, len(self.weeks) - 1)
+        rows = np.array([self.rows[symptom] for symptom in symptoms], dtype=np.intp)
+        return symptoms, self.weeks[start:end + 1], self.values[rows, start:end + 1]
+
+
+def symptom_store(locale, release):
+    return datastore.get(f"{locale}-symptoms", release)
+
+
+def symptom_matrix(locale, release):
+    """The SymptomMatrix of the locale, None without weekly symptom history."""
+    return datastore.get(f"{locale}-symptom-matrix", release)
+
+
+def build_symptom_matrix(locale, release):
+    if len(symptom_store(locale, release).weeks) < 2:
+        return None
+    return SymptomMatrix(locale, release)
+
+
+def week_label(week):
+    return week.strftime(datastore.WEEK_FORMAT) if week is not None else None
+
+
+def trace_patch(traces):
+    """A dash.Patch replacing only data arrays of a figure already in the browser, for figures whose
+    layout is the same for every week.
+
+    traces has a {property: values} per trace of the figure, nested properties as "marker.color".
+    """
+    from dash import Patch
+
+    patch = Patch()
+    for index, properties in enumerate(traces):
+        for name, values in properties.items():
+            *path, key = name.split(".")
+            target = patch["data"][index]
+            for part in path:
+                target = target[part]
+            target[key] = values
+    return patch
+
+
+def build_symptoms_fig(locale, release, index):
+    import plotly.express as px # imported on first use, it's slow to import and not needed to start serving
+
+    store = symptom_store(locale, release)
+    symptom_fig = px.bar(
+        store.slices[index],
+        x="frequentie",
+        y="symptom",
+        orientation="h",
+        labels=i18n.catalog(locale)["labels"],
+        color="frequentie",
+        color_continuous_scale="pinkyl",
+        template="plotly_white",
+        height=600,
+        range_x=[0, store.max_frequentie],
+        range_color=[0, store.max_frequentie],
+    )
+    symptom_fig.update_layout(yaxis={"categoryorder": "total ascending"})
+    return symptom_fig
+
+
+def build_symptom_heatmap(locale, release, weeks=None):
+    """Every symptom in the (first, last) week indices, most reported at the top."""
+    import plotly.graph_objects as go
+
+    matrix = symptom_matrix(locale, release)
+    symptoms, week_values, values = matrix.select(weeks=weeks)
+    labels = i18n.catalog(locale)["labels"]
+    heatmap_fig = go.Figure(go.Heatmap(
+        z=values,
+        x=[week_label(week) for week in week_values],
+        y=symptoms,
+        colorscale="pinkyl",
+        zmin=0,
+        zmax=matrix.max_frequentie,
+        colorbar={"title": {"text": labels["frequentie"]}},
+        hovertemplate=f"{labels['symptom']}: %{{y}}<br>{labels['week']}: %{{x}}<br>{labels['frequentie']}: %{{z}}<extra></extra>",
+    ))
+    heatmap_fig.update_layout(
+        template="plotly_white",
+        height=max(400, 25 * len(symptoms) + 150),
+        xaxis={"title": {"text": labels["week"]}, "type": "category"},
+        yaxis={"autorange": "reversed"},
+    )
+    return heatmap_fig
+
+
+def build_symptom_sparklines(locale, release, symptoms, weeks=None):
+    """A small line chart per selected symptom over the (first, last) week indices, one scale each."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    symptoms, week_values, values = symptom_matrix(locale, release).select(symptoms, weeks)
+    if not symptoms:
+        return go.Figure(layout={"template": "plotly_white", "height": 100, "xaxis": {"visible": False}, "yaxis": {"visible": False}})
+    labels = i18n.catalog(locale)["labels"]
+    x = [week_label(week) for week in week_values]
+    sparkline_fig = make_subplots(rows=len(symptoms), cols=1, shared_xaxes=True, vertical_spacing=0.02)
+    for row, (symptom, frequenties) in enumerate(zip(symptoms, values), start=1):
+        sparkline_fig.add_trace(go.Scatter(
+            x=x,
+            y=frequenties,
+            name=symptom,
+            mode="lines",
+            line={"color": "#c2185b", "width": 1.5},
+            hovertemplate=f"{symptom}<br>{labels['week']}: %{{x}}<br>{labels['frequentie']}: %{{y}}<extra></extra>",
+        ), row=row, col=1)
+        sparkline_fig.update_yaxes(
+            title={"text": symptom, "font": {"size": 11}},
+            showticklabels=False,
+            showgrid=False,
+            zeroline=False,
+            row=row, col=1,
+        )
+    sparkline_fig.update_xaxes(type="category", showticklabels=False, showgrid=False)
+    sparkline_fig.update_layout(template="plotly_white", showlegend=False, height=70 * len(symptoms) + 60, margin={"t": 20, "b": 20})
+    return sparkline_fig
+
+
+def trendline_frame(locale, release, name):
+    df = release.frames[locale][name]
+    # English flu-like weeks as text, so the axis is categorical and keeps the season's file order (see i18n.LOCALES)
+    if name == "flulike" and i18n.LOCALES[locale].get("categorical_flulike_weeks"):
+        df = df.astype({"week": str})
+    return df
+
+
+def is_categorical_axis(x):
+    return pd.api.types.is_string_dtype(x) or isinstance(x.dtype, pd.CategoricalDtype)
+
+
+def axis_positions(x):
+    """Where plotly puts every x value on the axis, as numbers: the values themselves, or the position of
+    the category for text (in order of appearance, like plotly does)."""
+    if is_categorical_axis(x):
+        categories = {value: position for position, value in enumerate(pd.unique(x))}
+        return x.map(categories).to_numpy(dtype=float)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return x.to_numpy(dtype="datetime64[ms]").astype(float)
+    return x.to_numpy(dtype=float)
+
+
+def range_positions(x, x_range):
+    # Date axes report their range as date strings
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return [pd.Timestamp(value).to_datetime64().astype("datetime64[ms]").astype(float) for value in x_range]
+    return [float(value) for value in x_range]
+
+
+def trendline_points(locale, release, name):
+    return len(trendline_frame(locale, release, name))
+
+
+def build_trendline(locale, release, name, x_range=None):
+    """Trendline of the flulike or covidlike data, only the weeks within x_range if given.
+
+    Above TRENDLINE_MAX_POINTS points the lines are drawn with WebGL instead of SVG and downsampled
+    (per season) to that many points, the pages load the full resolution of a range when zooming in.
+    """
+    import plotly.express as px
+
+    df = trendline_frame(locale, release, name)
+    positions = axis_positions(df["week"])
+    categories = list(pd.unique(df["week"])) if is_categorical_axis(df["week"]) else None
+    if x_range is not None:
+        low, high = range_positions(df["week"], x_range)
+        visible = (positions >= low) & (positions <= high)
+        df, positions = df[visible], positions[visible]
+    large = len(df) > TRENDLINE_MAX_POINTS
+    if large:
+        df = downsample.downsample(df, positions, "incidentie", "year", TRENDLINE_MAX_POINTS)
+
+    trendline_fig = px.line(
+        df,
+        x="week",
+        y="incidentie",
+        line_group="year" if name == "flulike" else None,
+        color="year",
+        labels=i18n.catalog(locale)["labels"],
+        # Markers are only useful while the points can be told apart
+        markers=not large,
+        template="plotly_white",
+        render_mode="webgl" if large else "auto",
+        # Left out weeks must not move the others on a categorical axis
+        category_orders={"week": categories} if categories and (large or x_range is not None) else None,
+    )
+
+    if name == "flulike":
+        trendline_fig.update_traces(
+            connectgaps=False
+        )
+
+    trendline_fig.update_traces(
+        line=dict(dash="dash"),
+        selector=dict(name="2022-2023")
+    )
+    trendline_fig.update_traces(
+        line=dict(dash="dash"),
+        selector=dict(name="2021-2022")
+    )
+    if x_range is not None:
+        trendline_fig.update_layout(xaxis_range=x_range)
+    return trendline_fig
+
+
+def build_figures(locale, release):
+    import plotly.express as px
+
+    spec = i18n.LOCALES[locale]
+    labels = i18n.catalog(locale)["labels"]
+    frames = release.frames[locale]
+
+    trendline_flu_fig = build_trendline(locale, release, "flulike")
+    trendline_covid_fig = build_trendline(locale, release, "covidlike")
+
+    # Map - provinces
+    map_fig = px.choropleth(
+        frames["provinces"],
+        geojson=release.provinces_geojson,
+        locations="province",
+        featureidkey=f"properties.{spec['province_key']}",
+        labels=labels,
+        basemap_visible=False,
+        color="deelnemersper1000",
+        color_continuous_scale="pinkyl",
+        fitbounds="locations",
+        projection="mercator",
+        height=600,
+    )
+
+    map_fig.update_layout(margin={"r": 10, "t": 0, "l": 10, "b": 0}, dragmode=False)
+
+    # Bar - sex and age group
+    # y-axis = age groups, x-axis = count, double sided with gender, bar chart
+    sexage_fig = px.bar(
+        frames["sexage"],
+        x="count",
+        y="age",
+        orientation="h",
+        color="sex",
+        labels=labels,
+        template="plotly_white",
+    )
+
+    return {
+        "trendline_flu": trendline_flu_fig,
+        "trendline_covid": trendline_covid_fig,
+        "province-map": map_fig,
+        "sexage": sexage_fig,
+    }
+
+
+def build_municipality_maps(locale, release):
+    """{measure: the municipality map at every level of detail (see maps.py) as figure dicts} for the
+    MUNICIPALITY_MEASURES in the data, None without municipality data."""
+    import plotly.express as px
+
+    municipalities = release.municipalities
+    if municipalities is None or "municipalities" not in release.frames[locale]:
+        return None
+    df = municipalities.locate(release.frames[locale]["municipalities"], "nis", i18n.LOCALES[locale]["province_key"])
+    measures = [measure for measure in MUNICIPALITY_MEASURES if measure in df]
+    figures = {}
+    for measure in measures:
+        figures[measure] = []
+        for level, geojson in enumerate(municipalities.levels):
+            map_fig = px.choropleth(
+                df,
+                geojson=geojson,
+                locations="id",
+                hover_name="name",
+                hover_data={"id": False, **{other: True for other in measures}},
+                labels=i18n.catalog(locale)["labels"],
+                basemap_visible=False,
+                color=measure,
+                color_continuous_scale="pinkyl",
+                fitbounds="locations",
+                projection="mercator",
+                height=600,
+            )
+            # Keep the zoom of the visitor when a finer level or another measure is swapped in
+            map_fig.update_layout(margin={"r": 10, "t": 0, "l": 10, "b": 0}, uirevision="municipality-map")
+            figures[measure].append(map_fig.to_plotly_json())
+    return figures
+
+
+def prebuilt_path(locale, release, name, output=FIGURE_DIR):
+    return os.path.join(output, release.version, locale, f"{name}.json")
+
+
+def load_prebuilt(locale, release, name):
+    try:
+        with open(prebuilt_path(locale, release, name), "rb") as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def symptoms_figure(locale, release, index):
+    figure = load_prebuilt(locale, release, f"symptoms-{index}")
+    if figure is None:
+        figure = build_symptoms_fig(locale, release, index)
+    return figure
+
+
+def load_figures(locale, release):
+    """The release's figures for a page, from the offline build if there is one for this release."""
+    figures = {name: load_prebuilt(locale, release, name) for name in STATIC_FIGURES}
+    if any(figure is None for figure in figures.values()):
+        figures = build_figures(locale, release)
+    store = symptom_store(locale, release)
+    figures["symptom_weeks"] = store.weeks
+    figures["symptom_week_data"] = store.week_data()
+    return figures
+
+
+def write_figures(locale, output):
+    import plotly.io as pio
+
+    release = datastore.current()
+    figures = build_figures(locale, release)
+    for index in range(len(symptom_store(locale, release).weeks)):
+        figures[f"symptoms-{index}"] = build_symptoms_fig(locale, release, index)
+
+    os.makedirs(os.path.dirname(prebuilt_path(locale, release, "", output)), exist_ok=True)
+    for name, figure in figures.items():
+        path = prebuilt_path(locale, release, name, output)
+        # Write next to the final file and rename, a running server never sees half a figure
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(pio.to_json(figure, validate=False, engine="orjson"))
+        os.replace(path + ".tmp", path)
+    return len(figures)
+
+
+for locale in i18n.LOCALES:
+    datastore.register_builder(f"{locale}-symptoms", functools.partial(SymptomStore, locale))
+    datastore.register_builder(f"{locale}-symptom-matrix", functools.partial(build_symptom_matrix, locale))
+    datastore.register_builder(f"{locale}-municipality-maps", functools.partial(build_municipality_maps, locale))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every locale's figures for the current data release to JSON")
+    parser.add_argument("--output", default=FIGURE_DIR)
+    parser.add_argument("--workers", type=int, default=len(i18n.LOCALES))
+    args = parser.parse_args()
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as pool:
+        counts = pool.map(write_figures, i18n.LOCALES, [args.output] * len(i18n.LOCALES))
+        for locale, count in zip(i18n.LOCALES, counts):
+            print(f"{locale}: wrote {count} figures to {os.path.join(args.output, datastore.current().version, locale)}")
+
+
+if __name__ == "__main__":
+    main()
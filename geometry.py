@@ -0,0 +1,149 @@
+# Province geometry for the choropleths. The full resolution GeoJSON ends up inside every map figure,
+# which makes it most of the layout payload, so it's loaded once, simplified and rounded here and
+# the result is cached on disk for the next start (and for the Streamlit app).
+#
+# Every polygon is simplified on its own, so at large tolerances neighbouring provinces can get thin
+# gaps or overlaps along their shared border. The defaults stay well below what's visible at the
+# size the maps are shown.
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+# Maximum deviation in degrees for the Douglas-Peucker simplification, 0 keeps every point
+TOLERANCE = float(os.getenv("GEOJSON_TOLERANCE", 0.0005))
+# Decimals kept for the coordinates (4 decimals is ~10m), empty keeps full precision
+PRECISION = os.getenv("GEOJSON_PRECISION", "4")
+CACHE_DIR = os.getenv("GEOMETRY_CACHE_DIR", "build/geometry")
+
+logger = logging.getLogger(__name__)
+
+
+def simplify_line(points, tolerance):
+    """Douglas-Peucker simplification of a list of [x, y] points, keeps the first and last point."""
+    if tolerance <= 0 or len(points) < 3:
+        return points
+    coords = np.asarray(points, dtype=float)
+    keep = np.zeros(len(coords), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(coords) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = coords[end] - coords[start]
+        offsets = coords[start + 1:end] - coords[start]
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return coords[keep].tolist()
+
+
+def simplify_ring(ring, tolerance):
+    simplified = simplify_line(ring, tolerance)
+    # A closed ring needs at least 4 points (first == last), keep the original if it collapsed
+    return simplified if len(simplified) >= 4 else ring
+
+
+def round_coordinates(coordinates, precision):
+    if isinstance(coordinates[0], (int, float)):
+        return [round(value, precision) for value in coordinates]
+    return [round_coordinates(part, precision) for part in coordinates]
+
+
+def simplify_geometry(geometry, tolerance):
+    if geometry["type"] == "Polygon":
+        coordinates = [simplify_ring(ring, tolerance) for ring in geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        coordinates = [[simplify_ring(ring, tolerance) for ring in polygon] for polygon in geometry["coordinates"]]
+    else:
+        coordinates = geometry["coordinates"]
+    return {"type": geometry["type"], "coordinates": coordinates}
+
+
+def simplify(geojson, tolerance=TOLERANCE, precision=PRECISION, keep_properties=None):
+    """Simplified copy of a FeatureCollection, optionally only keeping some feature properties."""
+    features = []
+    for feature in geojson["features"]:
+        geometry = simplify_geometry(feature["geometry"], tolerance)
+        if precision != "":
+            geometry["coordinates"] = round_coordinates(geometry["coordinates"], int(precision))
+        properties = feature.get("properties") or {}
+        if keep_properties is not None:
+            properties = {key: value for key, value in properties.items() if key in keep_properties}
+        features.append({"type": "Feature", "properties": properties, "geometry": geometry})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def payload_size(geojson):
+    return len(json.dumps(geojson, separators=(",", ":")))
+
+
+def load(path, tolerance=TOLERANCE, precision=PRECISION, keep_properties=None, cache_dir=CACHE_DIR):
+    """Load a GeoJSON file simplified, reusing the cached result for the same file and settings."""
+    with open(path, "rb") as f:
+        source = f.read()
+
+    settings = json.dumps([tolerance, precision, sorted(keep_properties) if keep_properties else None])
+    key = hashlib.sha1(source + settings.encode()).hexdigest()[:16]
+    cache_path = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(path))[0]}-{key}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            simplified = json.load(f)
+        logger.info("Loaded simplified %s from cache: %d -> %d bytes", path, len(source), payload_size(simplified))
+        return simplified
+
+    simplified = simplify(json.loads(source), tolerance, precision, keep_properties)
+    logger.info(
+        "Simplified %s (tolerance %s, precision %s): %d -> %d bytes",
+        path, tolerance, precision or "full", len(source), payload_size(simplified),
+    )
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path + ".tmp", "w") as f:
+            json.dump(simplified, f, separators=(",", ":"))
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError:
+        # A read-only checkout still works, it just simplifies again on the next start
+        logger.warning("Could not cache simplified geometry in %s", cache_dir)
+    return simplified
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report the size of a GeoJSON file before and after simplification")
+    parser.add_argument("path")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--precision", default=PRECISION)
+    args = parser.parse_args()
+
+    with open(args.path) as f:
+        original = json.load(f)
+    simplified = simplify(original, args.tolerance, args.precision)
+    points = lambda geojson: sum(len(ring) for feature in geojson["features"] for ring in _rings(feature["geometry"]))
+    print(f"before: {payload_size(original)} bytes, {points(original)} points")
+    print(f"after:  {payload_size(simplified)} bytes, {points(simplified)} points")
+
+
+def _rings(geometry):
+    if geometry["type"] == "Polygon":
+        return geometry["coordinates"]
+    if geometry["type"] == "MultiPolygon":
+        return [ring for polygon in geometry["coordinates"] for ring in polygon]
+    return []
+
+
+if __name__ == "__main__":
+    main()
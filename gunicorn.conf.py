@@ -0,0 +1,71 @@
+# Gunicorn settings, picked up automatically when running `gunicorn app:server` from this directory.
+import gc
+import glob
+import os
+import signal
+import time
+
+# Workers write their metrics here so /metrics can add them up (see metrics.py). This has to be set
+# before prometheus_client is imported, the values of a previous run are cleared in on_starting.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/dashboard-metrics")
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from prometheus_client import multiprocess
+
+# Build the figures of the embedded locales in the master (see PREBUILD_PAGES in pages/dashboard.py), so
+# the first visitor doesn't wait for them and the workers share them instead of each building their own
+os.environ.setdefault("PREBUILD_PAGES", "en,nl")
+
+import datastore
+
+bind = "0.0.0.0:9000"
+workers = 4
+
+# Import the app (and with it datastore and every page) once in the master, the workers then share the
+# loaded frames, GeoJSON and the figures of the PREBUILD_PAGES locales copy-on-write instead of each
+# loading their own copy. Figures of the other locales are built per worker on first request.
+preload_app = True
+
+
+def on_starting(server):
+    # Once per run (not when the config is reloaded on HUP), and only prometheus_client's own files, the
+    # directory may be one the operator pointed PROMETHEUS_MULTIPROC_DIR at
+    for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(path)
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the GC's reach, otherwise the collector touching the
+    # objects' reference counts in a worker would copy the shared memory pages anyway
+    gc.freeze()
+
+
+def replace_workers(server):
+    """Replace the workers one at a time, the new ones fork from the master and share its new release."""
+    # The old release is only referenced by the old workers now, let the master's collector see it again
+    gc.unfreeze()
+    gc.collect()
+    for pid in list(server.WORKERS):
+        # Gracefully, the worker finishes its requests while the master forks its replacement
+        os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + server.cfg.graceful_timeout + 5
+        while (pid in server.WORKERS or len(server.WORKERS) < server.num_workers) and time.monotonic() < deadline:
+            time.sleep(0.5)
+    server.log.info("Replaced the workers for data release %s", datastore.current().version)
+
+
+def when_ready(server):
+    # The master watches the data directory and loads new weekly releases, see datastore.py
+    datastore.start_watcher(on_reload=lambda: replace_workers(server))
+
+
+def post_worker_init(worker):
+    worker.log.info("Worker %s memory after init (kB): %s", worker.pid, datastore.memory_usage())
+
+
+def worker_exit(server, worker):
+    server.log.info("Worker %s memory at exit (kB): %s", worker.pid, datastore.memory_usage())
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,29 @@
+# Every locale gets the same dashboard, only the url, the translated texts, labels and values (locales/<locale>.json)
+# and the GeoJSON property holding the translated province names differ.
+# Adding a language means adding an entry here, a catalog in locales/ and its files in data/<locale>/.
+import functools
+import json
+import os
+
+LOCALES = {
+    "en": {
+        "path": "/en",
+        "province_key": "name-english",
+        # The English flu-like data starts mid-season, so keep the weeks in file order instead of sorting them numerically
+        "categorical_flulike_weeks": True,
+        # ISO week the seasons start in when aggregate.py builds a trendline, per dataset. Datasets without one
+        # (and the other locales) use calendar years, labelled like the season they end: 2024 is "2023-2024"
+        "season_start_weeks": {"flulike": 25},
+    },
+    "nl": {"path": "/nl-be", "province_key": "name-dutch"},
+    "fr": {"path": "/fr-be", "province_key": "name-french"},
+    "de": {"path": "/de-be", "province_key": "name-german"},
+}
+
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+
+
+@functools.lru_cache(maxsize=None)
+def catalog(locale):
+    with open(os.path.join(CATALOG_DIR, f"{locale}.json"), encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,126 @@
+# Static images of the dashboard figures for embeds that don't need interaction (partner sites,
+# newsletters), served on /img/<locale>/<chart>.<svg|png> without any of the Dash or Plotly JavaScript:
+#
+#   /img/nl/symptoms.png    the latest symptom week
+#   /img/en/province-map.svg
+#
+# Rendering needs kaleido and Chrome (the Dockerfile installs both, locally run plotly_get_chrome), without
+# them the endpoint answers 503. Every image is rendered once per data release and cached on disk in
+# <IMAGE_DIR>/<version>/<locale>/<chart>.<format>; the images of the current release can also be
+# rendered ahead of time:
+#
+#   python images.py [--output build/images] [--formats svg,png]
+import argparse
+import importlib.util
+import logging
+import os
+import threading
+import time
+
+from flask import abort, send_file
+
+import datastore
+import i18n
+
+IMAGE_DIR = os.getenv("IMAGE_DIR", "build/images")
+CHARTS = ["symptoms", "trendline_flu", "trendline_covid", "province-map", "sexage"]
+FORMATS = {"svg": "image/svg+xml", "png": "image/png"}
+# Width the images are rendered at, the height is the figure's own (or the renderer's default of 500)
+WIDTH = 900
+# PNGs at twice the size, so they stay sharp on high-dpi screens
+PNG_SCALE = 2
+
+logger = logging.getLogger(__name__)
+
+# Renders are slow and rare, one at a time keeps two requests from rendering the same image
+_render_lock = threading.Lock()
+
+
+# Set once rendering failed for lack of Chrome, so later requests answer 503 right away instead of trying again
+_renderer_error = None
+
+
+def renderer_available():
+    return _renderer_error is None and importlib.util.find_spec("kaleido") is not None
+
+
+def image_path(locale, release, chart, fmt, output=IMAGE_DIR):
+    return os.path.join(output, release.version, locale, f"{chart}.{fmt}")
+
+
+def chart_figure(locale, release, chart):
+    if chart == "symptoms":
+        return datastore.get(f"{locale}-latest-symptoms", release)
+    return datastore.get(locale, release)[chart]
+
+
+def render(locale, release, chart, fmt, output=IMAGE_DIR):
+    """Path of the image, rendering it first if it isn't cached yet."""
+    import plotly.io as pio
+
+    path = image_path(locale, release, chart, fmt, output)
+    if os.path.exists(path):
+        return path
+    with _render_lock:
+        if os.path.exists(path):
+            return path
+        figure = chart_figure(locale, release, chart)
+        start = time.perf_counter()
+        image = pio.to_image(figure, format=fmt, width=WIDTH, scale=PNG_SCALE if fmt == "png" else 1)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(image)
+        os.replace(path + ".tmp", path)
+        logger.info("Rendered %s (%d bytes) in %.3fs", path, len(image), time.perf_counter() - start)
+    return path
+
+
+def init_app(app, max_age):
+    """Serve the images of the current release on /img/<locale>/<chart>.<format>."""
+
+    def image_view(locale, chart, fmt):
+        if locale not in i18n.LOCALES or chart not in CHARTS or fmt not in FORMATS:
+            abort(404)
+        if not renderer_available():
+            abort(503, description="Image rendering is not available")
+        release = datastore.current()
+        try:
+            path = render(locale, release, chart, fmt)
+        except RuntimeError as e:
+            # kaleido raises this when it can't start Chrome, that won't change while the process runs
+            global _renderer_error
+            _renderer_error = e
+            logger.exception("Could not render /img/%s/%s.%s, image rendering is off in this process", locale, chart, fmt)
+            abort(503, description="Image rendering is not available")
+        response = send_file(
+            os.path.abspath(path),
+            mimetype=FORMATS[fmt],
+            etag=f"{release.version}-{locale}-{chart}-{fmt}",
+            last_modified=release.modified,
+            max_age=max_age,
+            conditional=True,
+        )
+        response.cache_control.public = True
+        return response
+
+    app.server.add_url_rule("/img/<locale>/<chart>.<fmt>", "image", image_view)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the dashboard figures of the current release to images")
+    parser.add_argument("--output", default=IMAGE_DIR)
+    parser.add_argument("--formats", default="svg,png")
+    args = parser.parse_args()
+
+    if not renderer_available():
+        parser.error("rendering images needs the kaleido package and Chrome (plotly_get_chrome)")
+    release = datastore.current()
+    for locale in i18n.LOCALES:
+        for chart in CHARTS:
+            for fmt in args.formats.split(","):
+                path = render(locale, release, chart, fmt, args.output)
+                print(f"{path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+# Load test replaying the traffic of embedded dashboards against a local gunicorn, once per worker class:
+#
+#   python loadtest.py [--worker-classes sync,gthread,gevent] [--concurrency 16] [--duration 30]
+#                      [--paths /en,/nl-be] [--slider-moves 0.5] [--workers 4] [--threads 4]
+#                      [--output build/loadtest/<timestamp>.json]
+#
+# Every simulated visitor does what a partner site's iframe does: load the page, /_dash-layout and
+# /_dash-dependencies and render the page through the Dash pages callback. The page comes with the
+# figure of the latest symptom week, the symptom callback only runs when a visitor moves the week
+# slider: --slider-moves times per visit on average, to a random other week, reported as "slider
+# move". Visitors run back to back from --concurrency threads for
+# --duration seconds (after --warmup seconds that aren't counted), and the results are printed and
+# written as JSON: visits and requests per second, latency percentiles and error rates, per worker
+# class and per request. Worker classes that aren't installed (gevent is optional) are skipped.
+import argparse
+import datetime
+import http.client
+import importlib.util
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmark import callback_body, percentile
+
+HEADERS = {
+    "Accept-Encoding": "gzip, br",
+    # What browsers send for a page loaded in an iframe
+    "Sec-Fetch-Dest": "iframe",
+    "Referer": "https://partner.example/",
+}
+# gunicorn's name for every worker class and the module it needs
+ASYNC_MODULES = {"gevent": "gevent", "eventlet": "eventlet"}
+
+
+def start_server(worker_class, port, workers, threads):
+    command = [
+        sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:server",
+        "--worker-class", worker_class, "--workers", str(workers), "--bind", f"127.0.0.1:{port}",
+    ]
+    if worker_class == "gthread":
+        command += ["--threads", str(threads)]
+    elif worker_class in ASYNC_MODULES:
+        command += ["--worker-connections", str(threads * 250)]
+    # A metrics directory of its own, gunicorn.conf.py clears it on start
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp(prefix="loadtest-metrics-"))
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/_dash-dependencies")
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("gunicorn did not start within 60s")
+
+
+def find_component(tree, component_id):
+    """The props of the component with component_id anywhere in a Dash callback response or layout."""
+    if isinstance(tree, dict):
+        if isinstance(tree.get("props"), dict) and tree["props"].get("id") == component_id:
+            return tree["props"]
+        children = tree.values()
+    elif isinstance(tree, list):
+        children = tree
+    else:
+        return None
+    for child in children:
+        found = find_component(child, component_id)
+        if found is not None:
+            return found
+    return None
+
+
+def decompress(data, encoding):
+    if encoding == "gzip":
+        import gzip
+        return gzip.decompress(data)
+    if encoding == "br":
+        import brotli
+        return brotli.decompress(data)
+    return data
+
+
+class Visitor:
+    """Loads embedded dashboards one after the other, over a keep-alive connection like a browser would use."""
+
+    def __init__(self, port, dependencies, results, slider_moves):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        self.results = results
+        self.slider_moves = slider_moves
+        self.pages = next(d for d in dependencies if any(i["id"] == "_pages_location" for i in d["inputs"]))
+        # None with CLIENTSIDE_SYMPTOMS, the browser switches weeks by itself then
+        self.symptoms = next((d for d in dependencies if d["output"] == "symptoms.figure" and not d["clientside_function"]), None)
+        # (slider props, locale) of every page, taken from the first rendered layout
+        self.sliders = {}
+
+    def request(self, kind, method, path, body=None):
+        headers = dict(HEADERS)
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            # A new connection for the next request
+            self.connection.close()
+            data, ok = None, False
+        self.results.append((kind, time.perf_counter() - start, ok))
+        return decompress(data, response.getheader("Content-Encoding")) if ok else None
+
+    def slider(self, path, content):
+        if path not in self.sliders:
+            layout = json.loads(content)
+            slider = find_component(layout, "filter-symptom-week--slider")
+            locale = find_component(layout, "page-locale")
+            self.sliders[path] = (slider, locale["data"]) if slider and locale else None
+        return self.sliders[path]
+
+    def moves(self):
+        """How many times the visitor moves the week slider, slider_moves on average."""
+        return int(self.slider_moves) + (random.random() < self.slider_moves % 1)
+
+    def visit(self, path):
+        self.request("page", "GET", path)
+        self.request("_dash-layout", "GET", "/_dash-layout")
+        self.request("_dash-dependencies", "GET", "/_dash-dependencies")
+        content = self.request("pages callback", "POST", "/_dash-update-component", callback_body(
+            self.pages, {("_pages_location", "pathname"): path, ("_pages_location", "search"): ""},
+        ))
+        # Pages without a week slider (or with CLIENTSIDE_SYMPTOMS) don't call back for the symptoms
+        slider = self.slider(path, content) if content is not None and self.symptoms is not None else None
+        if not slider:
+            return
+        props, locale = slider
+        week = props["value"]
+        for _ in range(self.moves()):
+            week = random.choice([other for other in range(props["min"], props["max"] + 1) if other != week])
+            self.request("slider move", "POST", "/_dash-update-component", callback_body(self.symptoms, {
+                ("filter-symptom-week--slider", "value"): week,
+                ("page-locale", "data"): locale,
+            }))
+
+
+def run_visitors(port, paths, concurrency, warmup, duration, slider_moves):
+    """Visits from concurrency threads, returns the (kind, seconds, ok) of the requests after the warmup and the visit count."""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    connection.request("GET", "/_dash-dependencies")
+    dependencies = json.loads(connection.getresponse().read())
+
+    start = time.monotonic()
+    measure_from, stop_at = start + warmup, start + warmup + duration
+    measured, visits, lock = [], [0], threading.Lock()
+
+    def visit_repeatedly():
+        results = []
+        visitor = Visitor(port, dependencies, results, slider_moves)
+        while time.monotonic() < stop_at:
+            counted = time.monotonic() >= measure_from
+            del results[:]
+            visitor.visit(random.choice(paths))
+            if counted:
+                with lock:
+                    measured.extend(results)
+                    visits[0] += 1
+
+    threads = [threading.Thread(target=visit_repeatedly, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return measured, visits[0]
+
+
+def summarize(results, seconds):
+    latencies = [latency for _, latency, _ in results]
+    errors = sum(1 for _, _, ok in results if not ok)
+    return {
+        "requests": len(results),
+        "requests_per_s": len(results) / seconds,
+        "error_rate": errors / len(results) if results else 0,
+        "p50_ms": percentile(latencies, 0.50) * 1000 if latencies else None,
+        "p95_ms": percentile(latencies, 0.95) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else None,
+        "max_ms": max(latencies) * 1000 if latencies else None,
+    }
+
+
+def load_test(worker_class, args):
+    server = start_server(worker_class, args.port, args.workers, args.threads)
+    try:
+        results, visits = run_visitors(args.port, args.paths, args.concurrency, args.warmup, args.duration, args.slider_moves)
+    finally:
+        server.terminate()
+        server.wait()
+    report = {"visits": visits, "visits_per_s": visits / args.duration, **summarize(results, args.duration), "by_request": {}}
+    for kind in dict.fromkeys(kind for kind, _, _ in results):
+        report["by_request"][kind] = summarize([result for result in results if result[0] == kind], args.duration)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test embedded dashboard traffic against local gunicorn servers")
+    parser.add_argument("--worker-classes", default="sync,gthread,gevent")
+    parser.add_argument("--paths", default="/en,/nl-be", help="pages the visitors embed, picked at random")
+    parser.add_argument("--slider-moves", type=float, default=0.5, help="symptom week slider moves per visit, on average")
+    parser.add_argument("--concurrency", type=int, default=16, help="visitors loading pages at the same time")
+    parser.add_argument("--duration", type=float, default=30, help="seconds measured per worker class")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of traffic before measuring")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4, help="threads per gthread worker")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    args.paths = args.paths.split(",")
+
+    report = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "settings": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": {},
+    }
+    for worker_class in args.worker_classes.split(","):
+        module = ASYNC_MODULES.get(worker_class)
+        if module and importlib.util.find_spec(module) is None:
+            print(f"{worker_class}: skipped, {module} is not installed")
+            continue
+        print(f"{worker_class}: {args.concurrency} visitors for {args.duration:.0f}s...")
+        result = load_test(worker_class, args)
+        report["results"][worker_class] = result
+        print(
+            f"{worker_class}: {result['visits_per_s']:.1f} visits/s, {result['requests_per_s']:.1f} requests/s, "
+            f"p50 {result['p50_ms']:.0f}ms, p99 {result['p99_ms']:.0f}ms, {result['error_rate']:.2%} errors"
+        )
+
+    output = args.output or os.path.join("build", "loadtest", f"{report['timestamp'].replace(':', '')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
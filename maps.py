@@ -0,0 +1,66 @@
+# Municipality geometry for the finer choropleth. ~580 municipalities at full resolution would make the
+# map megabytes, so the GeoJSON is simplified at several levels of detail (see geometry.py) and the page
+# swaps in a finer level as the map is zoomed in. The features sent to the browser carry nothing but
+# their position as id: values are matched to them through an index built once per release, not by
+# comparing names in every figure.
+#
+# The map is optional: it's only shown when the release has data/municipalities.geojson (with the
+# municipality's NIS code in the "nis" property and the translated names in the same properties as
+# the provinces, see i18n.LOCALES) and data/<locale>/municipalities.csv, with the columns nis,
+# deelnemersper1000 (participants per 1000 residents) and optionally incidentie (flu-like incidence per
+# 1000 participants). With both, the visitor can choose which one the map shows.
+import logging
+import os
+
+import geometry
+import i18n
+
+# Douglas-Peucker tolerance of every level, coarsest first
+TOLERANCES = [float(value) for value in os.getenv("MUNICIPALITY_TOLERANCES", "0.005,0.001,0.0002").split(",")]
+# Map zoom (geo.projection.scale) from which every level is shown, one per tolerance
+ZOOMS = [float(value) for value in os.getenv("MUNICIPALITY_ZOOMS", "0,3,8").split(",")]
+ID_PROPERTY = "nis"
+
+logger = logging.getLogger(__name__)
+
+
+class MultiResolutionMap:
+    def __init__(self, path, name_properties, key=ID_PROPERTY, tolerances=TOLERANCES, zooms=ZOOMS):
+        if len(zooms) != len(tolerances):
+            raise ValueError("Every municipality map level needs a tolerance and a zoom")
+        levels = [geometry.load(path, tolerance, keep_properties={key, *name_properties}) for tolerance in tolerances]
+        # Simplifying keeps the order of the features, so a position is the same feature on every level
+        features = levels[0]["features"]
+        self.index = {feature["properties"][key]: position for position, feature in enumerate(features)}
+        self.names = {name: [feature["properties"].get(name) for feature in features] for name in name_properties}
+        self.levels = [
+            {
+                "type": "FeatureCollection",
+                "features": [
+                    {"type": "Feature", "id": position, "properties": {}, "geometry": feature["geometry"]}
+                    for position, feature in enumerate(level["features"])
+                ],
+            }
+            for level in levels
+        ]
+        self.zooms = zooms
+
+    def level(self, zoom):
+        """The most detailed level for a map zoomed to zoom."""
+        return max(level for level, start in enumerate(self.zooms) if (zoom or 0) >= start)
+
+    def locate(self, frame, column, name_property):
+        """frame with the feature id and name of every row, rows without a feature are left out."""
+        ids = frame[column].map(self.index)
+        if ids.isna().any():
+            logger.warning("No municipality geometry for %s", sorted(frame.loc[ids.isna(), column].tolist()))
+        frame = frame.assign(id=ids).dropna(subset=["id"]).astype({"id": int})
+        names = self.names[name_property]
+        return frame.assign(name=[names[position] for position in frame["id"]])
+
+
+def load(data_dir):
+    path = os.path.join(data_dir, "municipalities.geojson")
+    if not os.path.exists(path):
+        return None
+    return MultiResolutionMap(path, {spec["province_key"] for spec in i18n.LOCALES.values()})
@@ -0,0 +1,92 @@
+# Prometheus metrics for the dashboard, served as text on /metrics.
+#
+# Under gunicorn every worker has its own counters, so prometheus_client runs in multiprocess mode:
+# gunicorn.conf.py points PROMETHEUS_MULTIPROC_DIR at a directory shared by the workers, and /metrics
+# (whichever worker answers it) adds up the values of all of them.
+import functools
+import os
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+SIZE_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+REQUEST_LATENCY = Histogram("dashboard_request_duration_seconds", "Request latency", ["route"])
+RESPONSES = Counter("dashboard_responses_total", "Responses sent", ["route", "status"])
+RESPONSE_BYTES = Histogram("dashboard_response_bytes", "Response payload size (after compression)", ["route"], buckets=SIZE_BUCKETS)
+CALLBACK_LATENCY = Histogram("dashboard_callback_duration_seconds", "Time spent in Dash callback functions", ["callback"])
+CACHE_REQUESTS = Counter("dashboard_cache_requests_total", "Cache lookups", ["cache", "result"])
+
+
+def timed(name):
+    """Decorator recording a Dash callback's execution time under name."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                CALLBACK_LATENCY.labels(name).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def route_label(page_paths, callbacks):
+    # Labels have to stay a small fixed set, so never use anything from the request unchecked
+    if request.path == "/_dash-update-component":
+        body = request.get_json(silent=True) or {}
+        for value in body.get("inputs", []):
+            # Page layouts are rendered by the Dash pages callback, label those by page
+            if isinstance(value, dict) and value.get("id") == "_pages_location" and value.get("value") in page_paths:
+                return f"page {value['value']}"
+        output = body.get("output")
+        return f"callback {output}" if output in callbacks else "callback other"
+    if request.path in page_paths:
+        return request.path
+    if request.url_rule is not None:
+        return request.url_rule.rule
+    return "unmatched"
+
+
+def metrics_view():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_app(app, page_paths):
+    """Record every request of a Dash app and serve the metrics on /metrics."""
+    server = app.server
+    page_paths = set(page_paths)
+
+    @server.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    def record_request(response):
+        if "metrics_start" not in g:
+            return response
+        route = route_label(page_paths, app.callback_map)
+        REQUEST_LATENCY.labels(route).observe(time.perf_counter() - g.metrics_start)
+        RESPONSES.labels(route, str(response.status_code)).inc()
+        if not response.is_streamed:
+            RESPONSE_BYTES.labels(route).observe(response.content_length or 0)
+        return response
+
+    # after_request hooks run in reverse order of registration, put this one first so it runs after
+    # flask-compress (and the cache headers) and sees the payload that is actually sent
+    server.after_request_funcs.setdefault(None, []).insert(0, record_request)
+    server.add_url_rule("/metrics", "metrics", metrics_view)
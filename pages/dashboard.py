@@ -0,0 +1,354 @@
+# One dashboard page per locale in i18n.LOCALES, the texts and labels come from the locale's catalog
+from dash import dcc, html, ctx, register_page, callback, clientside_callback, ClientsideFunction, Input, Output, State, no_update
+import functools
+import os
+
+import datastore
+import figures
+import i18n
+import metrics
+from figure_cache import figure_cache
+from figures import colors
+
+# Locales whose figures are built at startup instead of on the first request, e.g. "en,nl" (gunicorn.conf.py
+# defaults to the embedded locales, so they are built in the master and shared with the workers)
+PREBUILD_PAGES = [locale for locale in os.getenv("PREBUILD_PAGES", "").split(",") if locale]
+
+# Switch symptom weeks in the browser instead of calling back to the server on every slider move
+CLIENTSIDE_SYMPTOMS = os.getenv("CLIENTSIDE_SYMPTOMS", "false").lower() == "true"
+
+
+# Bar - symptoms
+def symptoms_fig(locale, release, index):
+    week = figures.symptom_store(locale, release).weeks[index] # have to convert the number back to a date for the figure cache
+    return figure_cache.get_or_build((locale, week, release.version), lambda: figures.symptoms_figure(locale, release, index))
+
+
+def update_symptoms_plot(week, locale):
+    # The page starts with the full figure of the latest week, other weeks only change the bars
+    return figures.trace_patch(figures.symptom_store(locale, datastore.current()).week_traces(week))
+
+
+if CLIENTSIDE_SYMPTOMS:
+    clientside_callback(
+        ClientsideFunction(namespace="symptoms", function_name="switch_week"),
+        Output("symptoms", "figure"),
+        Input("filter-symptom-week--slider", "value"),
+        State("symptoms-weeks", "data"),
+        State("symptoms", "figure"),
+    )
+else:
+    callback(
+        Output("symptoms", "figure"),
+        Input("filter-symptom-week--slider", "value"),
+        State("page-locale", "data"),
+        prevent_initial_call=True,
+    )(metrics.timed("update_symptoms_plot")(update_symptoms_plot))
+
+
+# Symptom trends - every symptom over a range of weeks, sparklines of the selected ones
+SYMPTOM_TRENDS_SELECTED = int(os.getenv("SYMPTOM_TRENDS_SELECTED", 5))
+
+
+def update_symptom_heatmap(weeks, locale):
+    release = datastore.current()
+    return figure_cache.get_or_build(
+        (locale, "heatmap", tuple(weeks), release.version),
+        lambda: figures.build_symptom_heatmap(locale, release, weeks),
+    )
+
+
+def update_symptom_sparklines(symptoms, weeks, locale):
+    release = datastore.current()
+    return figure_cache.get_or_build(
+        (locale, "sparklines", tuple(symptoms or ()), tuple(weeks), release.version),
+        lambda: figures.build_symptom_sparklines(locale, release, symptoms or [], weeks),
+    )
+
+
+callback(
+    Output("symptom-heatmap", "figure"),
+    Input("symptom-trends-weeks", "value"),
+    State("page-locale", "data"),
+    prevent_initial_call=True,
+)(metrics.timed("update_symptom_heatmap")(update_symptom_heatmap))
+
+callback(
+    Output("symptom-sparklines", "figure"),
+    Input("symptom-trends-symptoms", "value"),
+    Input("symptom-trends-weeks", "value"),
+    State("page-locale", "data"),
+    prevent_initial_call=True,
+)(metrics.timed("update_symptom_sparklines")(update_symptom_sparklines))
+
+
+# Trendlines - full resolution on zoom
+TRENDLINES = {"trendline_flu": "flulike", "trendline_covid": "covidlike"}
+
+
+def zoom_range(relayout):
+    """The x range zoomed to, None when zoomed out again, False for other changes (legend clicks, hover modes, ...)."""
+    relayout = relayout or {}
+    if "xaxis.range[0]" in relayout and "xaxis.range[1]" in relayout:
+        return [relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]]
+    if "xaxis.range" in relayout:
+        return relayout["xaxis.range"]
+    if relayout.get("xaxis.autorange"):
+        return None
+    return False
+
+
+def update_trendline(name, relayout, locale):
+    x_range = zoom_range(relayout)
+    release = datastore.current()
+    # Small trendlines are sent in full with the page, the browser can zoom by itself
+    if x_range is False or figures.trendline_points(locale, release, TRENDLINES[name]) <= figures.TRENDLINE_MAX_POINTS:
+        return no_update
+    if x_range is None:
+        return datastore.get(locale, release)[name]
+    return figures.build_trendline(locale, release, TRENDLINES[name], x_range)
+
+
+for name in TRENDLINES:
+    callback(
+        Output(name, "figure"),
+        Input(name, "relayoutData"),
+        State("page-locale", "data"),
+        prevent_initial_call=True,
+    )(metrics.timed(f"update_{name}")(functools.partial(update_trendline, name)))
+
+
+# Map - municipalities, a finer level of detail is swapped in when zooming in (see maps.py)
+def update_municipality_map(relayout, measure, level, locale):
+    release = datastore.current()
+    municipality_maps = datastore.get(f"{locale}-municipality-maps", release)
+    if not municipality_maps:
+        return no_update, no_update
+    maps_of_measure = municipality_maps.get(measure) or next(iter(municipality_maps.values()))
+    if ctx.triggered_id == "municipality-map-measure":
+        # Same uirevision, the map stays where the visitor zoomed to
+        return maps_of_measure[level], no_update
+    relayout = relayout or {}
+    scale = relayout.get("geo.projection.scale")
+    if scale is None:
+        return no_update, no_update
+    new_level = release.municipalities.level(scale)
+    if new_level == level:
+        return no_update, no_update
+    # Open the finer level where the visitor zoomed to, instead of fitting the whole country again
+    figure = maps_of_measure[new_level]
+    geo = dict(figure["layout"]["geo"], fitbounds=False, projection=dict(figure["layout"]["geo"].get("projection", {}), scale=scale))
+    if "geo.center.lon" in relayout and "geo.center.lat" in relayout:
+        geo["center"] = {"lon": relayout["geo.center.lon"], "lat": relayout["geo.center.lat"]}
+    return {"data": figure["data"], "layout": dict(figure["layout"], geo=geo)}, new_level
+
+
+callback(
+    Output("municipality-map", "figure"),
+    Output("municipality-map-level", "data"),
+    Input("municipality-map", "relayoutData"),
+    Input("municipality-map-measure", "value"),
+    State("municipality-map-level", "data"),
+    State("page-locale", "data"),
+    prevent_initial_call=True,
+)(metrics.timed("update_municipality_map")(update_municipality_map))
+
+
+def layout(locale):
+    # Figures are built (and cached for the release) on the first visit of a locale
+    release = datastore.current()
+    page_figures = datastore.get(locale, release)
+    latest_symptoms_fig = datastore.get(f"{locale}-latest-symptoms", release)
+    texts = i18n.catalog(locale)["texts"]
+    store = figures.symptom_store(locale, release)
+    weeks = store.weeks
+    has_slider = len(weeks) > 1
+
+    symptom_section = []
+    if has_slider:
+        symptom_slider = dcc.Slider(
+            min=0,
+            max=len(weeks) - 1,
+            marks=store.marks,
+            value=len(weeks) - 1,
+            id="filter-symptom-week--slider",
+            step=1,
+            included=False,
+        )
+        symptom_section += [
+            dcc.Graph(id="symptoms", figure=latest_symptoms_fig),
+            dcc.Store(id="symptoms-weeks", data=page_figures["symptom_week_data"] if CLIENTSIDE_SYMPTOMS else None),
+            html.Div(
+                symptom_slider,
+                style={'width': '85%', 'margin': 'auto'}
+            ),
+        ]
+    else:
+        symptom_section.append(dcc.Graph(id="symptoms", figure=latest_symptoms_fig))
+
+    symptom_trends_section = []
+    matrix = figures.symptom_matrix(locale, release)
+    if matrix is not None:
+        symptom_trends = datastore.get(f"{locale}-symptom-trends", release)
+        symptom_trends_section.append(html.Div(
+            children=[
+                html.H2(
+                    children=texts["symptom_trends_title"],
+                    style={"textAlign": "left", "color": colors["text"]},
+                ),
+                html.P(
+                    children=texts["symptom_trends_text"],
+                    style={"textAlign": "left", "color": colors["text"]},
+                ),
+                dcc.Graph(id="symptom-heatmap", figure=symptom_trends["heatmap"]),
+                dcc.Dropdown(
+                    options=matrix.symptoms,
+                    value=matrix.symptoms[:SYMPTOM_TRENDS_SELECTED],
+                    multi=True,
+                    id="symptom-trends-symptoms",
+                ),
+                dcc.Graph(id="symptom-sparklines", figure=symptom_trends["sparklines"]),
+                html.Div(
+                    dcc.RangeSlider(
+                        min=0,
+                        max=len(matrix.weeks) - 1,
+                        marks=store.marks,
+                        value=[0, len(matrix.weeks) - 1],
+                        id="symptom-trends-weeks",
+                        step=1,
+                    ),
+                    style={'width': '85%', 'margin': 'auto'}
+                ),
+            ],
+            # Leave room for the rotated slider marks
+            style={"paddingTop": "3rem"}
+        ))
+
+    municipality_section = []
+    municipality_maps = datastore.get(f"{locale}-municipality-maps", release)
+    if municipality_maps is not None:
+        labels = i18n.catalog(locale)["labels"]
+        municipality_section.append(html.Div(
+            children=[
+                html.H2(
+                    children=texts["municipalities_title"],
+                    style={"textAlign": "left", "color": colors["text"]},
+                ),
+                html.P(
+                    children=texts["municipalities_text"],
+                    style={"textAlign": "left", "color": colors["text"]},
+                ),
+                # Hidden when the release only has one measure per municipality
+                dcc.RadioItems(
+                    options=[{"label": labels[measure], "value": measure} for measure in municipality_maps],
+                    value=next(iter(municipality_maps)),
+                    id="municipality-map-measure",
+                    inline=True,
+                    style={} if len(municipality_maps) > 1 else {"display": "none"},
+                ),
+                # The coarsest level, update_municipality_map swaps in finer ones
+                dcc.Graph(id="municipality-map", figure=next(iter(municipality_maps.values()))[0], config={"scrollZoom": True}),
+                dcc.Store(id="municipality-map-level", data=0),
+            ],
+            style={"paddingTop": "1rem"}
+        ))
+
+    return html.Div(
+        children=[
+            dcc.Store(id="page-locale", data=locale),
+            html.Div(children=[
+                html.P(
+                    children=texts["last_updated"],
+                    style={"textAlign": "left", "color": colors["warning-text"]},
+                ),
+                html.P(
+                    children=texts["intro"],
+                    style={"textAlign": "left", "color": colors["text"]},
+                )]
+            ),
+            html.Div(
+                children=[
+                    html.H2(
+                        children=texts["symptoms_title"],
+                        style={"textAlign": "left", "color": colors["text"]},
+                    ),
+                    html.P(
+                        children=texts["symptoms_text"],
+                        style={"textAlign": "left", "color": colors["text"]},
+                    ),
+                    *symptom_section,
+                ],
+                style={"paddingTop": "1rem"}
+            ),
+            *symptom_trends_section,
+            html.Div(
+                children=[
+                    html.H2(
+                        children=texts["flulike_title"],
+                        style={"textAlign": "left", "color": colors["text"]},
+                    ),
+                    html.P(
+                        children=texts["flulike_text"],
+                        style={"textAlign": "left", "color": colors["text"]},
+                    ),
+                    dcc.Graph(id="trendline_flu", figure=page_figures["trendline_flu"])
+                ],
+                # Leave room for the rotated slider marks
+                style={"paddingTop": "3rem" if has_slider else "1rem"}
+            ),
+            html.Div(
+                children=[
+                    html.H2(
+                        children=texts["covidlike_title"],
+                        style={"textAlign": "left", "color": colors["text"]},
+                    ),
+                    html.P(
+                        children=texts["covidlike_text"],
+                        style={"textAlign": "left", "color": colors["text"]},
+                    ),
+                    dcc.Graph(id="trendline_covid", figure=page_figures["trendline_covid"])
+                ],
+                style={"paddingTop": "1rem"}
+            ),
+            html.Div(
+                children=[
+                    html.H2(
+                        children=texts["participants_title"],
+                        style={"textAlign": "left", "color": colors["text"]},
+                    ),
+                    html.P(
+                        children=texts["participants_text"],
+                        style={"textAlign": "left", "color": colors["text"]},
+                    ),
+                    dcc.Graph(id="province-map", figure=page_figures["province-map"], style={"margin": "auto", "width": "100%"}),
+                    dcc.Graph(id="sexage", figure=page_figures["sexage"]),
+                ],
+                style={"paddingTop": "1rem"}
+            ),
+            *municipality_section,
+        ],
+    )
+
+
+for locale, spec in i18n.LOCALES.items():
+    register_page(f"pages.dashboard-{locale}", path=spec["path"], layout=functools.partial(layout, locale))
+    datastore.register_builder(locale, functools.partial(figures.load_figures, locale))
+    # Pre-warm the figure cache with the latest symptom week of every release, that's what the first visitor sees
+    datastore.register_builder(f"{locale}-latest-symptoms", functools.partial(
+        lambda locale, release: symptoms_fig(locale, release, len(figures.symptom_store(locale, release).weeks) - 1),
+        locale,
+    ))
+    # The explorer as a page opens it: every week, the most reported symptoms selected
+    datastore.register_builder(f"{locale}-symptom-trends", functools.partial(
+        lambda locale, release: {
+            "heatmap": figures.build_symptom_heatmap(locale, release),
+            "sparklines": figures.build_symptom_sparklines(
+                locale, release, figures.symptom_matrix(locale, release).symptoms[:SYMPTOM_TRENDS_SELECTED],
+            ),
+        },
+        locale,
+    ))
+
+for locale in PREBUILD_PAGES:
+    # Rendering the layout builds everything the page needs (figures, symptom matrix, maps)
+    layout(locale)
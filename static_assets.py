@@ -0,0 +1,232 @@
+# Build step for the static files the dashboard pages load, run once per image (see the Dockerfile):
+#
+#   python static_assets.py [--output build/assets] [--skip-vendor]
+#
+# 1. Third-party scripts (VENDOR_SCRIPTS) are downloaded, checked against their pinned sha256 and written
+#    into assets/vendor/ (not in git) under a name with a hash of
+#    their contents, Dash then serves them from assets/ like our own scripts instead of the page
+#    loading them from a CDN. Without a vendored copy app.py falls back to the CDN.
+# 2. Every script and stylesheet the pages load (Dash's and Plotly's bundles and assets/) is compressed
+#    with gzip and brotli at the highest levels, too slow to do per request, into --output.
+#
+# init_app serves those compressed copies to browsers that accept them, and marks every file whose url
+# changes with its contents (Dash's fingerprinted bundles, assets with their ?m= timestamp) as immutable,
+# so repeat visits don't even revalidate them.
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import pkgutil
+import sys
+import urllib.request
+
+from dash.fingerprint import check_fingerprint
+from flask import Response, request
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+VENDOR_DIR = os.path.join(ASSETS_DIR, "vendor")
+COMPRESSED_DIR = os.getenv("COMPRESSED_ASSET_DIR", "build/assets")
+# Pinned to an exact version, and only vendored when the download has the expected sha256. A script
+# without a known hash (or a different download) isn't vendored, main() prints the hash it got so the
+# pin can be reviewed and filled in; the pages then load the same pinned url from the CDN.
+VENDOR_SCRIPTS = {
+    "iframe-resizer-child": {
+        "url": "https://cdn.jsdelivr.net/npm/@iframe-resizer/child@5.3.2",
+        "sha256": None,
+    },
+}
+# Smaller files aren't worth an extra lookup
+MIN_SIZE = 1024
+IMMUTABLE_MAX_AGE = 31536000  # 1 year
+
+logger = logging.getLogger(__name__)
+
+
+def vendored():
+    """Name -> file name in assets/vendor/ of the vendored scripts."""
+    try:
+        with open(os.path.join(VENDOR_DIR, "manifest.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def external_scripts():
+    # Scripts in assets/ are added to the pages by Dash, only the ones that weren't vendored come from the CDN
+    scripts = vendored()
+    return [
+        {"src": script["url"], "type": "text/javascript", "async": True}
+        for name, script in VENDOR_SCRIPTS.items() if name not in scripts
+    ]
+
+
+def vendor_script(name, data):
+    """Write a vendored script under a name with its content hash, replacing earlier versions."""
+    os.makedirs(VENDOR_DIR, exist_ok=True)
+    filename = f"{name}.{hashlib.sha256(data).hexdigest()[:12]}.js"
+    for old in os.listdir(VENDOR_DIR):
+        if old.startswith(f"{name}.") and old.endswith(".js") and old != filename:
+            os.remove(os.path.join(VENDOR_DIR, old))
+    with open(os.path.join(VENDOR_DIR, filename), "wb") as f:
+        f.write(data)
+    manifest = dict(vendored(), **{name: filename})
+    with open(os.path.join(VENDOR_DIR, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return filename
+
+
+def package_version(package_name):
+    return str(getattr(sys.modules.get(package_name), "__version__", ""))
+
+
+def asset_version(path):
+    return str(os.stat(path).st_mtime_ns)
+
+
+def source_files(dash_app):
+    """(url path without fingerprint, version, contents) of every script and stylesheet the pages load."""
+    # Dash registers the bundles a page needs while rendering it
+    client = dash_app.server.test_client()
+    client.get("/")
+    for package_name, paths in dash_app.registered_paths.items():
+        for path in sorted(paths):
+            try:
+                data = pkgutil.get_data(package_name, path)
+            except FileNotFoundError:
+                # Source maps are registered too but not always shipped
+                continue
+            yield f"_dash-component-suites/{package_name}/{path}", package_version(package_name), data
+    for directory, _, filenames in os.walk(ASSETS_DIR):
+        for filename in sorted(filenames):
+            if filename.endswith((".js", ".css")):
+                path = os.path.join(directory, filename)
+                with open(path, "rb") as f:
+                    yield f"assets/{os.path.relpath(path, ASSETS_DIR)}", asset_version(path), f.read()
+
+
+def compress(dash_app, output):
+    import brotli
+
+    manifest = {}
+    for url_path, version, data in source_files(dash_app):
+        if len(data) < MIN_SIZE:
+            continue
+        encodings = {}
+        for encoding, compressed in (
+            ("br", brotli.compress(data, quality=11)),
+            ("gzip", gzip.compress(data, compresslevel=9, mtime=0)),
+        ):
+            if len(compressed) >= len(data):
+                continue
+            filename = f"{url_path}.{version}.{'br' if encoding == 'br' else 'gz'}"
+            os.makedirs(os.path.dirname(os.path.join(output, filename)), exist_ok=True)
+            with open(os.path.join(output, filename), "wb") as f:
+                f.write(compressed)
+            encodings[encoding] = filename
+        manifest[url_path] = {"version": version, "encodings": encodings}
+        sizes = ", ".join(f"{encoding} {os.path.getsize(os.path.join(output, name))}" for encoding, name in encodings.items())
+        print(f"{url_path}: {len(data)} bytes -> {sizes}")
+    with open(os.path.join(output, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_compressed(directory):
+    """The compressed copies in directory that still match the installed packages and assets."""
+    try:
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        logger.info("No pre-compressed assets in %s, run static_assets.py to build them", directory)
+        return {}
+    current = {}
+    for url_path, entry in manifest.items():
+        if url_path.startswith("assets/"):
+            source = os.path.join(ASSETS_DIR, url_path[len("assets/"):])
+            version = asset_version(source) if os.path.exists(source) else None
+        else:
+            version = package_version(url_path.split("/")[1])
+        # Left over from other package versions or an edited asset, compressed on the fly instead
+        if version == entry["version"]:
+            current[url_path] = {encoding: os.path.join(directory, name) for encoding, name in entry["encodings"].items()}
+    return current
+
+
+def init_app(app, directory=COMPRESSED_DIR):
+    """Serve pre-compressed copies and immutable cache headers for the pages' scripts and stylesheets."""
+    compressed = load_compressed(directory)
+
+    def serve_compressed():
+        if request.method != "GET":
+            return None
+        url_path, fingerprinted = check_fingerprint(request.path.lstrip("/"))
+        if url_path.startswith("assets/"):
+            fingerprinted = "m" in request.args
+        files = compressed.get(url_path)
+        if not fingerprinted or not files:
+            return None
+        accepted = request.accept_encodings
+        encoding = next((encoding for encoding in ("br", "gzip") if encoding in files and accepted[encoding]), None)
+        if encoding is None:
+            return None
+        with open(files[encoding], "rb") as f:
+            response = Response(f.read(), mimetype=mimetypes.guess_type(url_path)[0])
+        # flask-compress leaves responses that already have a Content-Encoding alone
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        return response
+
+    def add_immutable_headers(response):
+        if request.method not in ("GET", "HEAD") or response.status_code != 200:
+            return response
+        path = request.path.lstrip("/")
+        if path.startswith("_dash-component-suites/"):
+            immutable = check_fingerprint(path)[1]
+        elif path.startswith("assets/"):
+            immutable = "m" in request.args or path.startswith("assets/vendor/")
+        else:
+            immutable = False
+        if immutable:
+            # Flask sends static files with no-cache unless told otherwise
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        return response
+
+    app.server.before_request(serve_compressed)
+    app.server.after_request(add_immutable_headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vendor third-party scripts and pre-compress the pages' static files")
+    parser.add_argument("--output", default=COMPRESSED_DIR)
+    parser.add_argument("--skip-vendor", action="store_true", help="keep the vendored scripts as they are")
+    args = parser.parse_args()
+
+    if not args.skip_vendor:
+        for name, script in VENDOR_SCRIPTS.items():
+            url = script["url"]
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    data = response.read()
+            except OSError as e:
+                # The pages keep loading it from the CDN
+                print(f"Could not download {url}, keeping the current copy if there is one: {e}")
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            if digest != script["sha256"]:
+                print(f"Not vendoring {url}: its sha256 is {digest}, expected {script['sha256']}")
+                continue
+            print(f"Vendored {url} as assets/vendor/{vendor_script(name, data)}")
+
+    # Imported here, the vendored scripts have to be in assets/ before Dash looks at the folder
+    import app
+
+    compress(app.app, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,68 @@
 import streamlit as st
 import pandas as pd
-import json
 import plotly.express as px
 import altair as alt
+import os
+import sys
+
+# Share the simplified province geometry (geometry.py) and the vendored scripts (static_assets.py) with the Dash app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import geometry
+import static_assets
+
+DATA_DIR = "../data"
+
+
+def data_version():
+    """Changes whenever a new release is published, the caches below are keyed on it.
+
+    Cheap enough for every rerun: the manifest aggregate.py writes, or else the modification times of the files.
+    """
+    manifest = os.path.join(DATA_DIR, "manifest.json")
+    if os.path.exists(manifest):
+        paths = [manifest]
+    else:
+        paths = [os.path.join(DATA_DIR, "provinces.geojson")] + [os.path.join(DATA_DIR, "en", name) for name in sorted(os.listdir(os.path.join(DATA_DIR, "en")))]
+    return "|".join(f"{path}:{os.stat(path).st_mtime_ns}" for path in paths)
+
+
+# Everything below is cached across sessions, a rerun only reads the data and builds the figures
+# again after a new release
+@st.cache_data(show_spinner=False)
+def load_csv(name, version):
+    return pd.read_csv(os.path.join(DATA_DIR, "en", f"{name}.csv"))
+
+
+@st.cache_data(show_spinner=False)
+def symptom_weeks(version):
+    # The weeks are written as YYYY/MM/DD, so sorting the strings sorts them by date
+    return sorted(load_csv("symptoms", version)["week"].dropna().unique())
+
+
+@st.cache_data(show_spinner=False)
+def symptoms_for_week(week, version):
+    df_symptoms = load_csv("symptoms", version)
+    return df_symptoms[df_symptoms["week"] == week]
+
+
+@st.cache_resource(show_spinner=False)
+def load_provinces(version):
+    return geometry.load(os.path.join(DATA_DIR, "provinces.geojson"), keep_properties={"name-english"}, cache_dir="../build/geometry")
+
+
+version = data_version()
 
 # Enable wide page mode
 st.set_page_config(layout="wide")
 
-# Add iframe resizer child, kind of hacky but it works and no graceful way to do it in Streamlit apparently
-st.markdown("""<script src="https://cdn.jsdelivr.net/npm/@iframe-resizer/child"></script>""", unsafe_allow_html=True)
+# Add iframe resizer child, kind of hacky but it works and no graceful way to do it in Streamlit apparently.
+# Inlined from the copy static_assets.py vendored for the Dash app if there is one, else from the CDN.
+vendored = static_assets.vendored().get("iframe-resizer-child")
+if vendored:
+    with open(os.path.join(static_assets.VENDOR_DIR, vendored), encoding="utf-8") as f:
+        st.markdown(f"<script>{f.read()}</script>", unsafe_allow_html=True)
+else:
+    st.markdown(f"""<script src="{static_assets.VENDOR_SCRIPTS['iframe-resizer-child']['url']}"></script>""", unsafe_allow_html=True)
 
 # Last updated and introduction
 st.markdown("""
@@ -24,18 +78,23 @@ st.markdown("""
             Our participants report every week whether they had one or more symptoms. In the past week we received 733 completed questionnaires. No symptoms were reported in 84.0% of the completed questionnaires. This graph shows the percentage of participants reporting a specific symptom. A combination of symptoms may indicate a specific infectious disease such as flu, COVID-19, RSV, or others.
             """)
 
-df_symptoms = pd.read_csv("../data/en/symptoms.csv")
-df_symptoms = df_symptoms[df_symptoms["week"] == "2024/06/19"]
+# A fragment, moving the week slider only reruns this function instead of the whole page
+@st.fragment
+def symptoms_chart(version):
+    weeks = symptom_weeks(version)
+    week = st.select_slider("Week", options=weeks, value=weeks[-1])
+    st.altair_chart(
+        alt.Chart(symptoms_for_week(week, version)).mark_bar().encode(
+            x='frequentie',
+            y=alt.Y('symptom', sort='-x'),
+        ).properties(
+            height=500
+        ),
+        use_container_width=True
+    )
+
 
-st.altair_chart(
-    alt.Chart(df_symptoms).mark_bar().encode(
-        x='frequentie',
-        y=alt.Y('symptom', sort='-x'),
-    ).properties(
-        height=500
-    ),
-    use_container_width=True
-)
+symptoms_chart(version)
 
 
 # Trend line flu-like symptoms
@@ -45,35 +104,40 @@ st.markdown("""
             This graph shows the number of participants per 1000 with flu-like symptoms over time.
             """)
 
-df_flu = pd.read_csv("../data/en/flulike.csv")
 
-df_flu["week"] = df_flu["week"].astype(str)
+@st.cache_data(show_spinner=False)
+def trendline_flu(version):
+    # st.cache_data hands every caller its own copy, so the frame can be changed here
+    df_flu = load_csv("flulike", version)
+    df_flu["week"] = df_flu["week"].astype(str)
 
-trendline_flu_fig = px.line(
-    df_flu,
-    x="week",
-    y="incidentie",
-    line_group="year",
-    color="year",
-    labels={"incidentie": "Incidence per 1000 participants", "week": "Week", "year": "Year"},
-    markers=True,
-    template="plotly_white",
-)
+    trendline_flu_fig = px.line(
+        df_flu,
+        x="week",
+        y="incidentie",
+        line_group="year",
+        color="year",
+        labels={"incidentie": "Incidence per 1000 participants", "week": "Week", "year": "Year"},
+        markers=True,
+        template="plotly_white",
+    )
 
-trendline_flu_fig.update_traces(
-    connectgaps=False
-)
+    trendline_flu_fig.update_traces(
+        connectgaps=False
+    )
 
-trendline_flu_fig.update_traces(
-    line=dict(dash="dash"),
-    selector=dict(name="2022-2023")
-)
-trendline_flu_fig.update_traces(
-    line=dict(dash="dash"),
-    selector=dict(name="2021-2022")
-)
+    trendline_flu_fig.update_traces(
+        line=dict(dash="dash"),
+        selector=dict(name="2022-2023")
+    )
+    trendline_flu_fig.update_traces(
+        line=dict(dash="dash"),
+        selector=dict(name="2021-2022")
+    )
+    return trendline_flu_fig
 
-st.plotly_chart(trendline_flu_fig)
+
+st.plotly_chart(trendline_flu(version))
 
 
 # Trendline - covid-like symptoms
@@ -83,28 +147,33 @@ st.markdown("""
             This graph shows the number of participants per 1000 with COVID-like symptoms over time.
             """)
 
-df_covidlike = pd.read_csv("../data/en/covidlike.csv")
-
-trendline_covid_fig = px.line(
-    df_covidlike,
-    x="week",
-    y="incidentie",
-    color="year",
-    labels={"incidentie": "Incidence per 1000 participants", "week": "Week", "year": "Year"},
-    markers=True,
-    template="plotly_white",
-) 
-
-trendline_covid_fig.update_traces(
-    line=dict(dash="dash"),
-    selector=dict(name="2022-2023")
-)
-trendline_covid_fig.update_traces(
-    line=dict(dash="dash"),
-    selector=dict(name="2021-2022")
-)
-
-st.plotly_chart(trendline_covid_fig)
+
+@st.cache_data(show_spinner=False)
+def trendline_covid(version):
+    df_covidlike = load_csv("covidlike", version)
+
+    trendline_covid_fig = px.line(
+        df_covidlike,
+        x="week",
+        y="incidentie",
+        color="year",
+        labels={"incidentie": "Incidence per 1000 participants", "week": "Week", "year": "Year"},
+        markers=True,
+        template="plotly_white",
+    )
+
+    trendline_covid_fig.update_traces(
+        line=dict(dash="dash"),
+        selector=dict(name="2022-2023")
+    )
+    trendline_covid_fig.update_traces(
+        line=dict(dash="dash"),
+        selector=dict(name="2021-2022")
+    )
+    return trendline_covid_fig
+
+
+st.plotly_chart(trendline_covid(version))
 
 # Map - provinces
 st.markdown("""
@@ -112,24 +181,28 @@ st.markdown("""
 
             These graphs show the age, gender and place of residence of our participants. We have 2227 participants, with 40.2% men and 59.4% women. The map shows the number of participants per 1000 inhabitants per province. A darker color indicates a higher participation from residents of the respective province. Not yet a participant? Sign up and help keep an eye on infectious diseases.
             """)
-provinces = json.load(open("../data/provinces.geojson"))
-
-df_provinces = pd.read_csv("../data/en/provinces.csv")
-
-map_fig = px.choropleth(
-    df_provinces,
-    geojson=provinces,
-    locations="province",
-    featureidkey="properties.name-english",
-    labels={"deelnemersper1000": "Participants per 1000 residents", "province": "Province"},
-    basemap_visible=False,
-    color="deelnemersper1000",
-    #color_continuous_scale="pinkyl",
-    fitbounds="locations",
-    projection="mercator",
-    height=600,
-)
-
-map_fig.update_layout(margin={"r": 10, "t": 0, "l": 10, "b": 0}, dragmode=False)
-
-st.plotly_chart(map_fig)
\ No newline at end of file
+
+
+@st.cache_data(show_spinner=False)
+def province_map(version):
+    df_provinces = load_csv("provinces", version)
+
+    map_fig = px.choropleth(
+        df_provinces,
+        geojson=load_provinces(version),
+        locations="province",
+        featureidkey="properties.name-english",
+        labels={"deelnemersper1000": "Participants per 1000 residents", "province": "Province"},
+        basemap_visible=False,
+        color="deelnemersper1000",
+        #color_continuous_scale="pinkyl",
+        fitbounds="locations",
+        projection="mercator",
+        height=600,
+    )
+
+    map_fig.update_layout(margin={"r": 10, "t": 0, "l": 10, "b": 0}, dragmode=False)
+    return map_fig
+
+
+st.plotly_chart(province_map(version))
\ No newline at end of file